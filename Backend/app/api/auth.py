@@ -1,67 +1,94 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.database.base import get_db
-from app.models.user import User
-from app.schemas.auth import UserCreate, UserLogin, Token, UserResponse
-from app.utils.security import verify_password, get_password_hash, create_access_token
-from app.utils.dependencies import get_current_user
-
-router = APIRouter(prefix="/api/auth", tags=["Authentication"])
-
-@router.post("/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
-    """Register a new user"""
-    # Check if email exists
-    if db.query(User).filter(User.email == user_data.email).first():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
-    
-    # Check if username exists
-    if db.query(User).filter(User.username == user_data.username).first():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already taken"
-        )
-    
-    # Create new user
-    hashed_password = get_password_hash(user_data.password)
-    new_user = User(
-        email=user_data.email,
-        username=user_data.username,
-        hashed_password=hashed_password
-    )
-    
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    
-    return new_user
-
-@router.post("/login", response_model=Token)
-async def login(user_data: UserLogin, db: Session = Depends(get_db)):
-    """Login and get access token"""
-    user = db.query(User).filter(User.email == user_data.email).first()
-    
-    if not user or not verify_password(user_data.password, user.hashed_password):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect email or password",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Inactive user account"
-        )
-    
-    access_token = create_access_token(data={"user_id": user.id, "email": user.email})
-    
-    return {"access_token": access_token, "token_type": "bearer"}
-
-@router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
-    """Get current user information"""
-    return current_user
\ No newline at end of file
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.base import get_db
+from app.models.user import User
+from app.schemas.auth import UserCreate, UserLogin, Token, UserResponse, Principal
+from app.utils.security import create_access_token
+from app.utils.dependencies import get_current_user
+from app.services.auth_cache import auth_cache
+from app.services.password_hasher import password_hasher
+
+router = APIRouter(prefix="/api/auth", tags=["Authentication"])
+
+@router.post("/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+async def signup(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
+    """Register a new user"""
+    # Check if email exists
+    if await db.scalar(select(User.id).where(User.email == user_data.email)):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
+    
+    # Check if username exists
+    if await db.scalar(select(User.id).where(User.username == user_data.username)):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Username already taken"
+        )
+    
+    # Create new user
+    hashed_password = await password_hasher.hash(user_data.password)
+    new_user = User(
+        email=user_data.email,
+        username=user_data.username,
+        hashed_password=hashed_password
+    )
+    
+    db.add(new_user)
+    await db.commit()
+    await db.refresh(new_user)
+    
+    return new_user
+
+@router.post("/login", response_model=Token)
+async def login(user_data: UserLogin, db: AsyncSession = Depends(get_db)):
+    """Login and get access token"""
+    user = await db.scalar(select(User).where(User.email == user_data.email))
+    
+    verified, new_hash = False, None
+    if user:
+        verified, new_hash = await password_hasher.verify(user_data.password, user.hashed_password)
+    
+    if not verified:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Inactive user account"
+        )
+    
+    if new_hash:
+        # Stored with older Argon2 cost parameters: upgrade while we have the password
+        user.hashed_password = new_hash
+        await db.commit()
+    
+    access_token = create_access_token(data={"user_id": user.id, "email": user.email})
+    
+    return {"access_token": access_token, "token_type": "bearer"}
+
+@router.get("/me", response_model=UserResponse)
+async def get_current_user_info(current_user: Principal = Depends(get_current_user)):
+    """Get current user information"""
+    return current_user
+
+@router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
+async def deactivate_account(
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Deactivate the current account and drop it from the auth cache"""
+    user = await db.get(User, current_user.id)
+    if user is None:
+        # Deleted after the cached principal was issued; don't keep serving it
+        await auth_cache.invalidate_user(current_user.id)
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    user.is_active = False
+    await db.commit()
+    await auth_cache.invalidate_user(user.id)
@@ -1,214 +1,390 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from pydantic import BaseModel
-from typing import List, Optional
-from app.database.base import get_db
-from app.models.user import User
-from app.models.chat import ChatSession, ChatMessage
-from app.utils.dependencies import get_current_user
-from app.services.vector_service import vector_service
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.messages import HumanMessage, AIMessage
-
-router = APIRouter(prefix="/api/chat", tags=["Chat"])
-
-class QueryRequest(BaseModel):
-    question: str
-    session_id: Optional[int] = None
-    groq_api_key: str
-
-class MessageResponse(BaseModel):
-    role: str
-    content: str
-    created_at: str
-
-@router.post("/query")
-async def query_documents(
-    request: QueryRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Query documents with chat history"""
-    
-    # Get or create session
-    if request.session_id:
-        session = db.query(ChatSession).filter(
-            ChatSession.id == request.session_id,
-            ChatSession.user_id == current_user.id
-        ).first()
-        if not session:
-            raise HTTPException(status_code=404, detail="Session not found")
-    else:
-        session = ChatSession(user_id=current_user.id)
-        db.add(session)
-        db.flush()
-    
-    # Search for relevant chunks
-    relevant_chunks = vector_service.similarity_search(
-        db, 
-        current_user.id, 
-        request.question, 
-        k=4
-    )
-    
-    if not relevant_chunks:
-        raise HTTPException(
-            status_code=400, 
-            detail="No documents found. Please upload documents first."
-        )
-    
-    # Build context from chunks
-    context = "\n\n".join([
-        f"Source: {chunk.metadata.get('filename', 'Unknown')}\n{chunk.content}"
-        for chunk in relevant_chunks
-    ])
-    
-    # Get chat history
-    history_messages = db.query(ChatMessage).filter(
-        ChatMessage.session_id == session.id
-    ).order_by(ChatMessage.created_at).all()
-    
-    chat_history = []
-    for msg in history_messages:
-        if msg.role == "user":
-            chat_history.append(HumanMessage(content=msg.content))
-        else:
-            chat_history.append(AIMessage(content=msg.content))
-    
-    # Create LLM
-    llm = ChatGroq(
-        groq_api_key=request.groq_api_key,
-        model_name="llama-3.3-70b-versatile"
-    )
-    
-    # Create prompt
-    system_prompt = """You are a helpful assistant answering questions based on the provided context.
-Use the context below to answer the question. If you don't know the answer, say so.
-Keep your answer concise and relevant.
-
-Context:
-{context}"""
-    
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", system_prompt),
-        MessagesPlaceholder("chat_history"),
-        ("human", "{question}")
-    ])
-    
-    chain = prompt | llm
-    
-    # Get response
-    response = chain.invoke({
-        "context": context,
-        "chat_history": chat_history,
-        "question": request.question
-    })
-    
-    answer = response.content
-    
-    # Save messages
-    user_message = ChatMessage(
-        session_id=session.id,
-        role="user",
-        content=request.question
-    )
-    db.add(user_message)
-    
-    assistant_message = ChatMessage(
-        session_id=session.id,
-        role="assistant",
-        content=answer
-    )
-    db.add(assistant_message)
-    
-    db.commit()
-    
-    # Extract citations
-    citations = [
-        {
-            "source": chunk.metadata.get("filename", "Unknown"),
-            "page": chunk.metadata.get("page"),
-            "content": chunk.content[:200] + "..."
-        }
-        for chunk in relevant_chunks
-    ]
-    
-    return {
-        "answer": answer,
-        "session_id": session.id,
-        "citations": citations
-    }
-
-@router.get("/sessions")
-async def get_sessions(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Get all chat sessions"""
-    sessions = db.query(ChatSession).filter(
-        ChatSession.user_id == current_user.id
-    ).order_by(ChatSession.created_at.desc()).all()
-    
-    return {
-        "sessions": [
-            {
-                "id": s.id,
-                "title": s.title,
-                "created_at": s.created_at.isoformat(),
-                "message_count": len(s.messages)
-            }
-            for s in sessions
-        ]
-    }
-
-@router.get("/history/{session_id}")
-async def get_chat_history(
-    session_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Get chat history for a session"""
-    session = db.query(ChatSession).filter(
-        ChatSession.id == session_id,
-        ChatSession.user_id == current_user.id
-    ).first()
-    
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    messages = db.query(ChatMessage).filter(
-        ChatMessage.session_id == session_id
-    ).order_by(ChatMessage.created_at).all()
-    
-    return {
-        "session_id": session_id,
-        "messages": [
-            {
-                "role": msg.role,
-                "content": msg.content,
-                "created_at": msg.created_at.isoformat()
-            }
-            for msg in messages
-        ]
-    }
-
-@router.delete("/sessions/{session_id}")
-async def delete_session(
-    session_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Delete a chat session"""
-    session = db.query(ChatSession).filter(
-        ChatSession.id == session_id,
-        ChatSession.user_id == current_user.id
-    ).first()
-    
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    db.delete(session)
-    db.commit()
-    
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, update, delete, func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel, Field
+from typing import Callable, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from app.database.base import get_db, AsyncSessionLocal
+from app.schemas.auth import Principal
+from app.models.chat import ChatSession, ChatMessage
+from app.models.document import DocumentChunk
+from app.utils.dependencies import get_current_user, get_chat_model_factory
+from app.services.vector_service import vector_service
+from app.services.answer_cache import answer_cache
+from app.services.chat_history import chat_history_service
+from app.services.rerank_service import rerank_service
+from app.config import settings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/chat", tags=["Chat"])
+
+SYSTEM_PROMPT = """You are a helpful assistant answering questions based on the provided context.
+Use the context below to answer the question. If you don't know the answer, say so.
+Keep your answer concise and relevant.
+
+Context:
+{context}"""
+
+PROMPT = ChatPromptTemplate.from_messages([
+    ("system", SYSTEM_PROMPT),
+    MessagesPlaceholder("chat_history"),
+    ("human", "{question}")
+])
+
+class QueryRequest(BaseModel):
+    question: str
+    session_id: Optional[int] = None
+    groq_api_key: str
+    # Optional ANN tuning: higher values trade latency for recall
+    ef_search: Optional[int] = Field(None, ge=1, le=1000)
+    probes: Optional[int] = Field(None, ge=1, le=1000)
+    # Optional rank-fusion weights for dense vs. full-text retrieval
+    vector_weight: Optional[float] = Field(None, ge=0)
+    lexical_weight: Optional[float] = Field(None, ge=0)
+
+class MessageResponse(BaseModel):
+    role: str
+    content: str
+    created_at: str
+
+async def get_session(db: AsyncSession, session_id: int, user_id: int) -> ChatSession:
+    """Get a session owned by the user or raise 404"""
+    session = await db.scalar(
+        select(ChatSession).where(
+            ChatSession.id == session_id,
+            ChatSession.user_id == user_id
+        )
+    )
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return session
+
+async def retrieve_chunks(
+    db: AsyncSession,
+    request: QueryRequest,
+    user_id: int,
+    timings: dict
+) -> Tuple[List[float], List[DocumentChunk]]:
+    """Embed the question, search for candidate chunks and rerank them; stage times go in timings"""
+    started = time.perf_counter()
+    query_embedding = (await vector_service.generate_embeddings([request.question], db))[0]
+    timings["embed_ms"] = elapsed_ms(started)
+    
+    started = time.perf_counter()
+    candidates = await vector_service.hybrid_search(
+        db, 
+        user_id, 
+        request.question, 
+        k=settings.RERANK_CANDIDATES if settings.RERANK_ENABLED else 4,
+        query_embedding=query_embedding,
+        vector_weight=request.vector_weight,
+        lexical_weight=request.lexical_weight,
+        ef_search=request.ef_search,
+        probes=request.probes
+    )
+    timings["retrieve_ms"] = elapsed_ms(started)
+    
+    started = time.perf_counter()
+    relevant_chunks = await rerank_service.rerank(request.question, candidates, k=4)
+    timings["rerank_ms"] = elapsed_ms(started)
+    
+    if not relevant_chunks:
+        raise HTTPException(
+            status_code=400, 
+            detail="No documents found. Please upload documents first."
+        )
+    return query_embedding, relevant_chunks
+
+def build_chain_input(request: QueryRequest, chunks: List[DocumentChunk], chat_history: list) -> dict:
+    context = "\n\n".join([
+        f"Source: {chunk.metadata.get('filename', 'Unknown')}\n{chunk.content}"
+        for chunk in chunks
+    ])
+    return {
+        "context": context,
+        "chat_history": chat_history,
+        "question": request.question
+    }
+
+def extract_citations(chunks: List[DocumentChunk]) -> List[dict]:
+    return [
+        {
+            "source": chunk.metadata.get("filename", "Unknown"),
+            "page": chunk.metadata.get("page"),
+            "content": chunk.content[:200] + "..."
+        }
+        for chunk in chunks
+    ]
+
+async def save_exchange(db: AsyncSession, user_id: int, session_id: Optional[int], question: str, answer: str) -> int:
+    """Persist the question and answer, creating the session if needed; returns the session id"""
+    if session_id is None:
+        session = ChatSession(user_id=user_id)
+        db.add(session)
+        await db.flush()
+        session_id = session.id
+    
+    db.add(ChatMessage(session_id=session_id, role="user", content=question))
+    db.add(ChatMessage(session_id=session_id, role="assistant", content=answer))
+    await db.execute(
+        update(ChatSession)
+        .where(ChatSession.id == session_id)
+        .values(message_count=ChatSession.message_count + 2, last_activity=func.now())
+    )
+    await db.commit()
+    return session_id
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+def encode_session_cursor(session: ChatSession) -> str:
+    """Keyset position after this session: '<created_at in µs since epoch>_<id>'"""
+    micros = (session.created_at - EPOCH) // timedelta(microseconds=1)
+    return f"{micros}_{session.id}"
+
+def decode_session_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_session_cursor; 400 for anything it did not produce"""
+    try:
+        micros, session_id = (int(part) for part in cursor.split("_"))
+        return EPOCH + timedelta(microseconds=micros), session_id
+    except (ValueError, OverflowError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post("/query")
+async def query_documents(
+    request: QueryRequest,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    chat_model: Callable[[Optional[str]], BaseChatModel] = Depends(get_chat_model_factory)
+):
+    """Query documents with chat history"""
+    session = None
+    if request.session_id:
+        session = await get_session(db, request.session_id, current_user.id)
+    
+    timings = {}
+    query_embedding, relevant_chunks = await retrieve_chunks(db, request, current_user.id, timings)
+    chat_history = await chat_history_service.load(db, session)
+    
+    # Follow-up answers depend on the conversation, so only standalone
+    # questions go through the answer cache
+    cached = None
+    if not chat_history:
+        cached = await answer_cache.lookup(db, current_user.id, query_embedding, relevant_chunks)
+    
+    llm = chat_model(request.groq_api_key)
+    if cached is not None:
+        answer = cached.answer
+    else:
+        started = time.perf_counter()
+        chain = PROMPT | llm
+        response = await chain.ainvoke(build_chain_input(request, relevant_chunks, chat_history))
+        answer = response.content
+        timings["generate_ms"] = elapsed_ms(started)
+        
+        if not chat_history:
+            await answer_cache.store(
+                db, current_user.id, request.question, query_embedding, relevant_chunks,
+                answer, timings["generate_ms"]
+            )
+    
+    session_id = await save_exchange(db, current_user.id, request.session_id, request.question, answer)
+    if chat_history:
+        chat_history_service.schedule_summary(session_id, llm)
+    
+    return {
+        "answer": answer,
+        "session_id": session_id,
+        "citations": extract_citations(relevant_chunks),
+        "cached": cached is not None,
+        "timings": timings
+    }
+
+@router.post("/query/stream")
+async def query_documents_stream(
+    request: QueryRequest,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    chat_model: Callable[[Optional[str]], BaseChatModel] = Depends(get_chat_model_factory)
+):
+    """Query documents, streaming the answer as server-sent events.
+    
+    Events: `citations` (sent first), `token` (answer text as it is
+    generated, or the whole answer at once on an answer cache hit), then
+    `done` with the session id once the exchange is saved, or `error` if
+    generation fails.
+    """
+    # Validation and retrieval happen before the response starts so
+    # failures still surface as regular HTTP errors
+    session = None
+    if request.session_id:
+        session = await get_session(db, request.session_id, current_user.id)
+    
+    timings = {}
+    query_embedding, relevant_chunks = await retrieve_chunks(db, request, current_user.id, timings)
+    chat_history = await chat_history_service.load(db, session)
+    chain_input = build_chain_input(request, relevant_chunks, chat_history)
+    llm = chat_model(request.groq_api_key)
+    chain = PROMPT | llm
+    user_id = current_user.id
+    
+    cached = None
+    if not chat_history:
+        cached = await answer_cache.lookup(db, user_id, query_embedding, relevant_chunks)
+    
+    # Keep what the lookup wrote (answer cache hit counts), then hand the pooled
+    # connection back while the model is generating
+    await db.commit()
+    await db.close()
+    
+    async def events():
+        yield sse_event("citations", extract_citations(relevant_chunks))
+        
+        if cached is not None:
+            yield sse_event("token", cached.answer)
+            async with AsyncSessionLocal() as stream_db:
+                session_id = await save_exchange(
+                    stream_db, user_id, request.session_id, request.question, cached.answer
+                )
+            yield sse_event("done", {"session_id": session_id, "cached": True, "timings": timings})
+            return
+        
+        started = time.perf_counter()
+        parts = []
+        try:
+            async for chunk in chain.astream(chain_input):
+                token = chunk.content if isinstance(chunk.content, str) else chunk.text
+                if token:
+                    parts.append(token)
+                    yield sse_event("token", token)
+        except Exception as e:
+            logger.exception("Streaming answer failed")
+            yield sse_event("error", {"detail": str(e)})
+            return
+        
+        # Persist on a fresh session; the request's session is closed above
+        answer = "".join(parts)
+        timings["generate_ms"] = elapsed_ms(started)
+        async with AsyncSessionLocal() as stream_db:
+            if not chat_history:
+                await answer_cache.store(
+                    stream_db, user_id, request.question, query_embedding, relevant_chunks,
+                    answer, timings["generate_ms"]
+                )
+            session_id = await save_exchange(
+                stream_db, user_id, request.session_id, request.question, answer
+            )
+        if chat_history:
+            chat_history_service.schedule_summary(session_id, llm)
+        yield sse_event("done", {"session_id": session_id, "cached": False, "timings": timings})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/sessions")
+async def get_sessions(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get chat sessions, newest first; pass next_cursor back as cursor for the next page"""
+    query = select(ChatSession).where(ChatSession.user_id == current_user.id)
+    if cursor is not None:
+        # Keyset: continue after the cursor position in (created_at, id) order;
+        # the position is in the cursor, so deleting that session is harmless
+        created_at, session_id = decode_session_cursor(cursor)
+        query = query.where(tuple_(ChatSession.created_at, ChatSession.id) < tuple_(created_at, session_id))
+    result = await db.execute(
+        query.order_by(ChatSession.created_at.desc(), ChatSession.id.desc()).limit(limit + 1)
+    )
+    sessions = result.scalars().all()
+    next_cursor = encode_session_cursor(sessions[limit - 1]) if len(sessions) > limit else None
+    
+    return {
+        "sessions": [
+            {
+                "id": s.id,
+                "title": s.title,
+                "created_at": s.created_at.isoformat(),
+                "last_activity": s.last_activity.isoformat() if s.last_activity else None,
+                "message_count": s.message_count
+            }
+            for s in sessions[:limit]
+        ],
+        "next_cursor": next_cursor
+    }
+
+@router.get("/history/{session_id}")
+async def get_chat_history(
+    session_id: int,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get chat history for a session"""
+    session = await db.scalar(
+        select(ChatSession).where(
+            ChatSession.id == session_id,
+            ChatSession.user_id == current_user.id
+        )
+    )
+    
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    result = await db.execute(
+        select(ChatMessage)
+        .where(ChatMessage.session_id == session_id)
+        .order_by(ChatMessage.created_at, ChatMessage.id)
+    )
+    messages = result.scalars().all()
+    
+    return {
+        "session_id": session_id,
+        "messages": [
+            {
+                "role": msg.role,
+                "content": msg.content,
+                "created_at": msg.created_at.isoformat()
+            }
+            for msg in messages
+        ]
+    }
+
+@router.delete("/sessions/{session_id}")
+async def delete_session(
+    session_id: int,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Delete a chat session; its messages follow through ON DELETE CASCADE"""
+    deleted = await db.scalar(
+        delete(ChatSession)
+        .where(
+            ChatSession.id == session_id,
+            ChatSession.user_id == current_user.id
+        )
+        .returning(ChatSession.id)
+    )
+    
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    await db.commit()
+    
     return {"status": "success", "message": "Session deleted"}
\ No newline at end of file
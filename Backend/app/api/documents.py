@@ -1,120 +1,286 @@
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from pydantic import BaseModel
-import tempfile
-import os
-from app.database.base import get_db
-from app.models.user import User
-from app.utils.dependencies import get_current_user
-from app.services.document_service import document_service
-
-router = APIRouter(prefix="/api/documents", tags=["Documents"])
-
-class URLUpload(BaseModel):
-    urls: List[str]
-
-class DocumentResponse(BaseModel):
-    id: int
-    filename: str
-    source_type: str
-    uploaded_at: str
-    chunk_count: int
-    
-    class Config:
-        from_attributes = True
-
-@router.post("/upload-pdf")
-async def upload_pdf(
-    file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Upload and process PDF file"""
-    if not file.filename.endswith('.pdf'):
-        raise HTTPException(status_code=400, detail="Only PDF files allowed")
-    
-    # Save to temporary file
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp:
-        content = await file.read()
-        tmp.write(content)
-        tmp_path = tmp.name
-    
-    try:
-        document = document_service.process_pdf(
-            db, 
-            current_user.id, 
-            tmp_path, 
-            file.filename
-        )
-        
-        return {
-            "status": "success",
-            "document_id": document.id,
-            "filename": document.filename,
-            "chunks": len(document.chunks)
-        }
-    finally:
-        os.unlink(tmp_path)
-
-@router.post("/upload-urls")
-async def upload_urls(
-    data: URLUpload,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Process URLs"""
-    results = []
-    
-    for url in data.urls:
-        try:
-            document = document_service.process_url(db, current_user.id, url)
-            results.append({
-                "url": url,
-                "status": "success",
-                "document_id": document.id,
-                "chunks": len(document.chunks)
-            })
-        except Exception as e:
-            results.append({
-                "url": url,
-                "status": "error",
-                "error": str(e)
-            })
-    
-    return {"results": results}
-
-@router.get("/list")
-async def list_documents(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """List all user's documents"""
-    documents = document_service.get_user_documents(db, current_user.id)
-    
-    return {
-        "documents": [
-            {
-                "id": doc.id,
-                "filename": doc.filename,
-                "source_type": doc.source_type,
-                "uploaded_at": doc.uploaded_at.isoformat(),
-                "chunk_count": len(doc.chunks)
-            }
-            for doc in documents
-        ]
-    }
-
-@router.delete("/{document_id}")
-async def delete_document(
-    document_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Delete a document"""
-    success = document_service.delete_document(db, document_id, current_user.id)
-    
-    if not success:
-        raise HTTPException(status_code=404, detail="Document not found")
-    
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from pydantic import BaseModel, Field
+import asyncio
+import shutil
+from app.database.base import get_db
+from app.models.user import User
+from app.schemas.auth import Principal
+from app.models.job import IngestionJob
+from app.utils.dependencies import get_current_user
+from app.services.document_service import document_service
+from app.services.ingestion_service import ingestion_service
+from app.services.text_splitter import ChunkingParams, resolve_chunking
+from app.services.auth_cache import auth_cache
+
+router = APIRouter(prefix="/api/documents", tags=["Documents"])
+
+class URLUpload(BaseModel):
+    urls: List[str]
+    incremental: bool = False  # update earlier documents from the same URLs in place
+    chunk_size: Optional[int] = None  # tokens; overrides the user's setting for these URLs
+    chunk_overlap: Optional[int] = None
+
+class URLBatchUpload(URLUpload):
+    urls: List[str] = Field(..., min_length=1, max_length=100)
+
+class ChunkingSettings(BaseModel):
+    chunk_size: Optional[int] = None  # tokens; null uses the server default
+    chunk_overlap: Optional[int] = None
+
+class DocumentDeleteBatch(BaseModel):
+    document_ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+class DocumentResponse(BaseModel):
+    id: int
+    filename: str
+    source_type: str
+    uploaded_at: str
+    chunk_count: int
+    
+    class Config:
+        from_attributes = True
+
+def spool_upload(file: UploadFile, path: str):
+    """Copy an upload to disk in fixed-size blocks"""
+    with open(path, "wb") as spool:
+        shutil.copyfileobj(file.file, spool)
+
+def upload_chunking(user: Principal, chunk_size: Optional[int] = None, chunk_overlap: Optional[int] = None) -> ChunkingParams:
+    """Chunking for an upload: its own values, else the user's, else the defaults"""
+    try:
+        return resolve_chunking(
+            {"chunk_size": user.chunk_size, "chunk_overlap": user.chunk_overlap},
+            {"chunk_size": chunk_size, "chunk_overlap": chunk_overlap}
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def serialize_job(job: IngestionJob) -> dict:
+    return {
+        "job_id": job.id,
+        "source_type": job.source_type,
+        "filename": job.filename,
+        "status": job.status,
+        "stage": job.stage,
+        "progress": {
+            "current": job.progress_current,
+            "total": job.progress_total
+        },
+        "attempts": job.attempts,
+        "error": job.error,
+        "document_id": job.document_id,
+        "chunking": job.chunking,
+        "result": job.result,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None
+    }
+
+@router.post("/upload-pdf", status_code=status.HTTP_202_ACCEPTED)
+async def upload_pdf(
+    file: UploadFile = File(...),
+    incremental: bool = Form(False),
+    chunk_size: Optional[int] = Form(None),
+    chunk_overlap: Optional[int] = Form(None),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Upload a PDF file and queue it for processing; with incremental, update the
+    user's earlier upload of the same filename, re-embedding only changed chunks"""
+    if not file.filename.endswith('.pdf'):
+        raise HTTPException(status_code=400, detail="Only PDF files allowed")
+    chunking = upload_chunking(current_user, chunk_size, chunk_overlap)
+    
+    # Spool to disk so the job survives restarts and can be retried
+    spool_path = ingestion_service.spool_path()
+    await asyncio.to_thread(spool_upload, file, spool_path)
+    
+    job = await ingestion_service.enqueue_pdf(
+        db, current_user.id, spool_path, file.filename, incremental, chunking
+    )
+    
+    return {
+        "status": "queued",
+        "job_id": job.id,
+        "filename": job.filename
+    }
+
+@router.post("/upload-urls", status_code=status.HTTP_202_ACCEPTED)
+async def upload_urls(
+    data: URLUpload,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Queue URLs for processing"""
+    chunking = upload_chunking(current_user, data.chunk_size, data.chunk_overlap)
+    results = []
+    
+    for url in data.urls:
+        job = await ingestion_service.enqueue_url(db, current_user.id, url, data.incremental, chunking)
+        results.append({
+            "url": url,
+            "status": "queued",
+            "job_id": job.id
+        })
+    
+    return {"results": results}
+
+@router.post("/upload-urls/batch", status_code=status.HTTP_202_ACCEPTED)
+async def upload_urls_batch(
+    data: URLBatchUpload,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Queue one job per URL; the pages are fetched concurrently right away and
+    ingested by the job workers, so poll /jobs/{job_id} for each result"""
+    chunking = upload_chunking(current_user, data.chunk_size, data.chunk_overlap)
+    urls = list(dict.fromkeys(data.urls))
+    jobs = await ingestion_service.enqueue_urls(db, current_user.id, urls, data.incremental, chunking)
+    
+    return {
+        "results": [
+            {"url": job.source, "status": "queued", "job_id": job.id}
+            for job in jobs
+        ]
+    }
+
+@router.get("/jobs")
+async def list_jobs(
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """List the user's recent ingestion jobs"""
+    jobs = await ingestion_service.get_user_jobs(db, current_user.id)
+    
+    return {"jobs": [serialize_job(job) for job in jobs]}
+
+@router.get("/jobs/{job_id}")
+async def get_job(
+    job_id: int,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get status and progress of an ingestion job"""
+    job = await ingestion_service.get_job(db, job_id, current_user.id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return serialize_job(job)
+
+@router.post("/jobs/{job_id}/retry", status_code=status.HTTP_202_ACCEPTED)
+async def retry_job(
+    job_id: int,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Retry a failed ingestion job"""
+    job = await ingestion_service.get_job(db, job_id, current_user.id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    if job.status != "failed":
+        raise HTTPException(status_code=409, detail="Only failed jobs can be retried")
+    
+    if not ingestion_service.source_available(job):
+        raise HTTPException(status_code=409, detail="The uploaded file has expired; please upload it again")
+    
+    job = await ingestion_service.retry_job(db, job)
+    
+    return serialize_job(job)
+
+@router.get("/chunking")
+async def get_chunking(current_user: Principal = Depends(get_current_user)):
+    """The user's chunking settings and the values new uploads will use"""
+    return {
+        "chunk_size": current_user.chunk_size,
+        "chunk_overlap": current_user.chunk_overlap,
+        "effective": upload_chunking(current_user)._asdict()
+    }
+
+@router.put("/chunking")
+async def update_chunking(
+    data: ChunkingSettings,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Set the user's chunk size and overlap in tokens (null restores the default)"""
+    try:
+        effective = resolve_chunking(data.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    user = await db.get(User, current_user.id)
+    if user is None:
+        # Deleted after the cached principal was issued; don't keep serving it
+        await auth_cache.invalidate_user(current_user.id)
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    user.chunk_size = data.chunk_size
+    user.chunk_overlap = data.chunk_overlap
+    await db.commit()
+    await auth_cache.invalidate_user(user.id)
+    
+    return {
+        "chunk_size": user.chunk_size,
+        "chunk_overlap": user.chunk_overlap,
+        "effective": effective._asdict()
+    }
+
+@router.get("/list")
+async def list_documents(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[int] = None,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """List the user's documents, newest first; pass next_cursor back as cursor for the next page"""
+    documents = await document_service.get_user_documents(db, current_user.id, limit + 1, cursor)
+    next_cursor = documents[limit - 1].id if len(documents) > limit else None
+    
+    return {
+        "documents": [
+            {
+                "id": doc.id,
+                "filename": doc.filename,
+                "source_type": doc.source_type,
+                "uploaded_at": doc.uploaded_at.isoformat(),
+                "chunk_count": doc.chunk_count
+            }
+            for doc in documents[:limit]
+        ],
+        "next_cursor": next_cursor
+    }
+
+@router.post("/delete/batch")
+async def delete_documents(
+    data: DocumentDeleteBatch,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Delete several documents; very large ones are listed under purging and
+    disappear at once while their chunks are removed in the background"""
+    document_ids = list(dict.fromkeys(data.document_ids))
+    deleted, purging = await document_service.delete_documents(db, document_ids, current_user.id)
+    found = set(deleted) | set(purging)
+    
+    return {
+        "deleted": deleted,
+        "purging": purging,
+        "not_found": [document_id for document_id in document_ids if document_id not in found]
+    }
+
+@router.delete("/{document_id}")
+async def delete_document(
+    document_id: int,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Delete a document"""
+    success = await document_service.delete_document(db, document_id, current_user.id)
+    
+    if not success:
+        raise HTTPException(status_code=404, detail="Document not found")
+    
     return {"status": "success", "message": "Document deleted"}
\ No newline at end of file
@@ -1,27 +1,148 @@
-from pydantic_settings import BaseSettings
-from typing import Optional
-
-class Settings(BaseSettings):
-    # Database
-    DATABASE_URL: str
-    
-    # JWT
-    SECRET_KEY: str
-    ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
-    
-    # Optional Groq API Key
-    GROQ_API_KEY: Optional[str] = None
-    
-    # Server
-    PORT: int = 8000
-    
-    # Embeddings
-    EMBEDDING_MODEL: str = "intfloat/e5-small-v2"
-    EMBEDDING_DIMENSION: int = 384
-    
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
-
+from pydantic_settings import BaseSettings
+from typing import Optional
+
+class Settings(BaseSettings):
+    # Database
+    DATABASE_URL: str
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_CONNECT_TIMEOUT: float = 10.0
+    DB_COMMAND_TIMEOUT: Optional[float] = None  # per-statement client timeout in seconds
+    
+    # JWT
+    SECRET_KEY: str
+    ALGORITHM: str = "HS256"
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    
+    # Authentication cache: verified tokens and user principals, so requests
+    # don't query users just to authenticate. With several API processes and
+    # no Redis, a deactivation takes up to AUTH_USER_CACHE_TTL to reach all of them
+    AUTH_TOKEN_CACHE_TTL: int = 300
+    AUTH_USER_CACHE_TTL: int = 30
+    AUTH_CACHE_SIZE: int = 10000
+    AUTH_CACHE_REDIS_URL: Optional[str] = None  # e.g. redis://localhost:6379/0 (needs the redis package)
+    
+    # Password hashing (Argon2id) runs on a bounded thread pool, off the event
+    # loop. Stored hashes with other cost parameters are upgraded at next login
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32  # hashes queued or running before signup/login answer 503
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536  # KiB per hash in flight
+    ARGON2_PARALLELISM: int = 4  # lanes per hash; each hash may use this many threads
+    
+    # Optional Groq API Key
+    GROQ_API_KEY: Optional[str] = None
+    LLM_MODEL: str = "llama-3.3-70b-versatile"
+    
+    # Chat history sent to the LLM: the last N turns within a token budget,
+    # older turns folded into a rolling per-session summary
+    CHAT_HISTORY_MAX_TURNS: int = 6
+    CHAT_HISTORY_MAX_TOKENS: int = 2000
+    CHAT_SUMMARY_ENABLED: bool = True
+    CHAT_SUMMARY_BATCH_MESSAGES: int = 40
+    
+    # Server
+    PORT: int = 8000
+    PRELOAD_MODELS: bool = True  # load and warm models at startup; /ready waits for it
+    
+    # Embeddings
+    EMBEDDING_MODEL: str = "intfloat/e5-small-v2"
+    EMBEDDING_DIMENSION: int = 384
+    EMBEDDING_BACKEND: str = "torch"  # 'torch', 'onnx' or 'onnx-int8' (ONNX Runtime, CPU)
+    EMBEDDING_QUANTIZATION: str = "avx2"  # int8 config: 'arm64', 'avx2', 'avx512' or 'avx512_vnni'
+    EMBEDDING_ONNX_DIR: str = "models"  # where locally quantized models are written
+    
+    # Out-of-process embedding pool (python -m app.services.embedding_pool).
+    # When an address is set, API processes send texts there instead of
+    # loading the model themselves
+    EMBEDDING_POOL_ADDRESS: Optional[str] = None  # 'host:port' or a unix socket path
+    EMBEDDING_POOL_AUTHKEY: Optional[str] = None  # shared secret of the pool and API processes; required with an address
+    EMBEDDING_POOL_WORKERS: int = 2
+    EMBEDDING_POOL_TORCH_THREADS: int = 1  # intra-op threads per worker process
+    EMBEDDING_POOL_QUEUE_SIZE: int = 32  # pending batches before callers are pushed back
+    EMBEDDING_POOL_QUEUE_TIMEOUT: float = 5.0  # wait for queue space before replying busy
+    EMBEDDING_POOL_REQUEST_TIMEOUT: float = 60.0  # give up on a reply (e.g. its worker died)
+    EMBEDDING_BATCH_MAX_SIZE: int = 64
+    EMBEDDING_BATCH_MAX_WAIT_MS: float = 5.0
+    EMBEDDING_CACHE_SIZE: int = 50000
+    EMBEDDING_CACHE_PERSIST: bool = True
+    
+    # Answer cache: reuse an answer when the same chunks were retrieved for
+    # a question at least this cosine-similar to one answered before
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_SIMILARITY: float = 0.95
+    # Entries older than this are not served and are pruned, as are a user's
+    # entries beyond the newest ANSWER_CACHE_MAX_PER_USER
+    ANSWER_CACHE_MAX_AGE_HOURS: float = 168.0
+    ANSWER_CACHE_MAX_PER_USER: int = 500
+    
+    # Vector index
+    VECTOR_INDEX_TYPE: str = "hnsw"  # 'hnsw', 'ivfflat' or 'none'
+    VECTOR_HNSW_M: int = 16
+    VECTOR_HNSW_EF_CONSTRUCTION: int = 64
+    VECTOR_HNSW_EF_SEARCH: Optional[int] = None  # None keeps the server default (40)
+    VECTOR_IVFFLAT_LISTS: int = 100
+    VECTOR_IVFFLAT_PROBES: Optional[int] = None  # None keeps the server default (1)
+    VECTOR_INDEX_MAINTENANCE_WORK_MEM: str = "256MB"
+    VECTOR_ITERATIVE_SCAN: Optional[str] = "relaxed_order"  # pgvector >= 0.8; None to disable
+    VECTOR_SEARCH_OVERFETCH: int = 2
+    
+    # Hybrid retrieval: dense and full-text candidates merged with
+    # reciprocal-rank fusion, score = sum(weight / (SEARCH_RRF_K + rank))
+    SEARCH_VECTOR_WEIGHT: float = 1.0
+    SEARCH_LEXICAL_WEIGHT: float = 1.0  # 0 disables the full-text query
+    SEARCH_RRF_K: int = 60
+    SEARCH_HYBRID_CANDIDATES: int = 20  # candidates taken from each retriever
+    # Full-text matches ranked per query; common terms stop scanning here
+    SEARCH_LEXICAL_MAX_MATCHES: int = 1000
+    # Hybrid searches running their full-text query on a second connection
+    # at once (added to the pool's overflow); the rest run both on one
+    SEARCH_PARALLEL_SESSIONS: int = 5
+    
+    # Cross-encoder reranking of retrieved candidates (CPU)
+    RERANK_ENABLED: bool = True
+    RERANK_MODEL: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    RERANK_CANDIDATES: int = 20
+    RERANK_BATCH_SIZE: int = 32
+    RERANK_TIME_BUDGET_MS: float = 500.0  # past this, keep retrieval order
+    RERANK_MAX_PENDING: int = 2  # batches queued or running; further requests skip reranking
+    RERANK_CACHE_SIZE: int = 10000
+    
+    # Ingestion jobs
+    INGESTION_WORKERS: int = 2
+    INGESTION_SPOOL_DIR: str = "uploads"
+    INGESTION_SPOOL_RETENTION_HOURS: float = 24.0  # then uploads of failed jobs can no longer be retried
+    INGESTION_EMBED_BATCH_SIZE: int = 64
+    INGESTION_PAGE_BATCH_SIZE: int = 16  # PDF pages parsed, embedded and stored per step
+    PDF_PARSE_WORKERS: int = 0  # processes extracting and splitting PDF pages; 0 or 1 uses a thread
+    INGESTION_STALE_AFTER_SECONDS: int = 600
+    CHUNK_INSERT_METHOD: str = "copy"  # 'copy' or 'values'
+    CHUNK_INSERT_BATCH_SIZE: int = 1000
+    
+    # Document deletion: up to this many chunks per request are deleted with
+    # their documents; larger deletions hide the documents at once and purge
+    # their chunks in the background, DOCUMENT_PURGE_BATCH_SIZE rows per transaction
+    DOCUMENT_DELETE_MAX_CHUNKS: int = 20000
+    DOCUMENT_PURGE_BATCH_SIZE: int = 5000
+    
+    # Chunking, in tokens of the embedding model's tokenizer; users and
+    # single uploads can override size and overlap
+    CHUNK_SIZE_TOKENS: int = 256
+    CHUNK_OVERLAP_TOKENS: int = 48
+    CHUNK_MAX_TOKENS: int = 510  # e5's 512-token input minus [CLS] and [SEP]
+    
+    # URL fetching
+    URL_FETCH_CONCURRENCY: int = 16
+    URL_FETCH_PER_HOST_LIMIT: int = 4
+    URL_FETCH_CONNECT_TIMEOUT: float = 5.0
+    URL_FETCH_READ_TIMEOUT: float = 20.0
+    URL_FETCH_MAX_BYTES: int = 10 * 1024 * 1024
+    URL_FETCH_USER_AGENT: str = "RAG-App/3.0 (+https://the-rag-app.onrender.com)"
+    
+    class Config:
+        env_file = ".env"
+        case_sensitive = True
+
 settings = Settings()
\ No newline at end of file
@@ -1,32 +1,169 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from app.config import settings
-
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    echo=False
-)
-
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-Base = declarative_base()
-
-def get_db():
-    """Dependency for getting database session"""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-def init_db():
-    """Initialize database tables"""
-    Base.metadata.create_all(bind=engine)
-    
-    # Enable pgvector extension
-    from sqlalchemy import text
-    with engine.connect() as conn:
-        conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
-        conn.commit()
\ No newline at end of file
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import make_url, URL
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.ext.declarative import declarative_base
+from app.config import settings
+import asyncio
+import logging
+
+def async_database_url(database_url: str) -> URL:
+    """Point a postgres:// URL at the asyncpg driver"""
+    url = make_url(database_url)
+    if url.drivername in ("postgres", "postgresql", "postgresql+psycopg2", "postgresql+psycopg"):
+        url = url.set(drivername="postgresql+asyncpg")
+    
+    # asyncpg spells libpq's sslmode as ssl
+    sslmode = url.query.get("sslmode")
+    if sslmode:
+        url = url.difference_update_query(["sslmode"]).update_query_dict({"ssl": sslmode})
+    return url
+
+engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    pool_size=settings.DB_POOL_SIZE,
+    # Headroom for the second connection of concurrent hybrid searches
+    max_overflow=settings.DB_MAX_OVERFLOW + settings.SEARCH_PARALLEL_SESSIONS,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=True,
+    connect_args={
+        "timeout": settings.DB_CONNECT_TIMEOUT,
+        "command_timeout": settings.DB_COMMAND_TIMEOUT
+    },
+    echo=False
+)
+
+# expire_on_commit=False: attributes stay readable after commit without
+# an implicit (and in async, impossible) lazy refresh
+AsyncSessionLocal = async_sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+Base = declarative_base()
+
+def cascade_foreign_key(table: str, column: str, referenced: str) -> str:
+    """Upgrade statement turning table.column's foreign key into ON DELETE CASCADE,
+    a no-op once it is one"""
+    constraint = f"{table}_{column}_fkey"
+    return f"""
+    DO $$
+    BEGIN
+        IF EXISTS (
+            SELECT 1 FROM pg_constraint WHERE conname = '{constraint}' AND confdeltype <> 'c'
+        ) THEN
+            ALTER TABLE {table}
+                DROP CONSTRAINT {constraint},
+                ADD CONSTRAINT {constraint} FOREIGN KEY ({column})
+                    REFERENCES {referenced}(id) ON DELETE CASCADE;
+        END IF;
+    END $$
+    """
+
+# Upgrades for databases created by earlier versions. Append only: the
+# schema_version table records how many of these a database has run, so
+# each one (some rewrite or scan large tables) runs once, not every startup
+SCHEMA_UPGRADES = [
+    "ALTER TABLE document_chunks ADD COLUMN IF NOT EXISTS user_id INTEGER REFERENCES users(id)",
+    """
+    UPDATE document_chunks dc SET user_id = d.user_id
+    FROM documents d
+    WHERE dc.document_id = d.id AND dc.user_id IS NULL
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_document_chunks_user_document ON document_chunks (user_id, document_id)",
+    """
+    ALTER TABLE document_chunks ADD COLUMN IF NOT EXISTS content_tsv tsvector
+        GENERATED ALWAYS AS (to_tsvector('english', content)) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_document_chunks_content_tsv ON document_chunks USING gin (content_tsv)",
+    "ALTER TABLE chat_sessions ADD COLUMN IF NOT EXISTS summary TEXT",
+    "ALTER TABLE chat_sessions ADD COLUMN IF NOT EXISTS summarized_until_id INTEGER",
+    "CREATE INDEX IF NOT EXISTS ix_chat_messages_session_created ON chat_messages (session_id, created_at, id)",
+    "ALTER TABLE document_chunks ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)",
+    """
+    UPDATE document_chunks SET content_hash = encode(sha256(convert_to(content, 'UTF8')), 'hex')
+    WHERE content_hash IS NULL
+    """,
+    "ALTER TABLE ingestion_jobs ADD COLUMN IF NOT EXISTS incremental BOOLEAN NOT NULL DEFAULT false",
+    "ALTER TABLE ingestion_jobs ADD COLUMN IF NOT EXISTS result JSON",
+    "ALTER TABLE ingestion_jobs ADD COLUMN IF NOT EXISTS chunking JSON",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS chunk_size INTEGER",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS chunk_overlap INTEGER",
+    # Denormalized counters: added nullable so NULL marks rows not backfilled yet
+    "ALTER TABLE documents ADD COLUMN IF NOT EXISTS chunk_count INTEGER",
+    """
+    UPDATE documents d SET chunk_count = (
+        SELECT count(*) FROM document_chunks dc WHERE dc.document_id = d.id
+    )
+    WHERE d.chunk_count IS NULL
+    """,
+    "ALTER TABLE documents ALTER COLUMN chunk_count SET DEFAULT 0",
+    "CREATE INDEX IF NOT EXISTS ix_documents_user_id ON documents (user_id, id)",
+    "ALTER TABLE chat_sessions ADD COLUMN IF NOT EXISTS message_count INTEGER",
+    """
+    UPDATE chat_sessions s SET
+        message_count = (SELECT count(*) FROM chat_messages m WHERE m.session_id = s.id),
+        last_activity = coalesce(
+            (SELECT max(m.created_at) FROM chat_messages m WHERE m.session_id = s.id),
+            s.created_at
+        )
+    WHERE s.message_count IS NULL
+    """,
+    "ALTER TABLE chat_sessions ALTER COLUMN message_count SET DEFAULT 0",
+    "ALTER TABLE chat_sessions ALTER COLUMN last_activity SET DEFAULT now()",
+    "CREATE INDEX IF NOT EXISTS ix_chat_sessions_user_created ON chat_sessions (user_id, created_at, id)",
+    # Set-based deletes: chunks and messages cascade from their parent row
+    "CREATE INDEX IF NOT EXISTS ix_document_chunks_document_index ON document_chunks (document_id, chunk_index)",
+    cascade_foreign_key("document_chunks", "document_id", "documents"),
+    cascade_foreign_key("chat_messages", "session_id", "chat_sessions"),
+    "ALTER TABLE documents ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMP WITH TIME ZONE",
+    "CREATE INDEX IF NOT EXISTS ix_answer_cache_user_id ON answer_cache (user_id, id)",
+    # Counters are backfilled above; match the models
+    "ALTER TABLE documents ALTER COLUMN chunk_count SET NOT NULL",
+    "ALTER TABLE chat_sessions ALTER COLUMN message_count SET NOT NULL",
+]
+
+# pg_advisory_xact_lock key serializing init_db across workers and instances
+SCHEMA_LOCK_KEY = 0x5C4E3A
+
+async def get_db():
+    """Dependency for getting database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def ping_db(timeout: float = 2.0) -> bool:
+    """Check that the pool can hand out a working connection"""
+    async def ping():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    
+    try:
+        await asyncio.wait_for(ping(), timeout)
+        return True
+    except Exception:
+        return False
+
+async def init_db():
+    """Create missing tables and run the schema upgrades this database has not run yet"""
+    async with engine.begin() as conn:
+        await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+        
+        # Enable pgvector extension (must exist before tables with vector columns)
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        
+        fresh = not await conn.run_sync(lambda sync_conn: inspect(sync_conn).has_table("documents"))
+        await conn.run_sync(Base.metadata.create_all)
+        
+        await conn.execute(text("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)"))
+        version = (await conn.execute(text("SELECT version FROM schema_version"))).scalar()
+        if version is None:
+            # create_all just built the current schema, or the database predates
+            # version tracking and needs every upgrade (they are idempotent)
+            version = len(SCHEMA_UPGRADES) if fresh else 0
+            await conn.execute(text("INSERT INTO schema_version (version) VALUES (:version)"), {"version": version})
+        
+        # create_all never alters existing tables; bring older schemas up to date
+        for statement in SCHEMA_UPGRADES[version:]:
+            await conn.execute(text(statement))
+        if version < len(SCHEMA_UPGRADES):
+            logging.getLogger(__name__).info(
+                "Upgraded schema from version %d to %d", version, len(SCHEMA_UPGRADES)
+            )
+            await conn.execute(text("UPDATE schema_version SET version = :version"), {"version": len(SCHEMA_UPGRADES)})
@@ -0,0 +1,163 @@
+"""Lifecycle of the ANN index on document_chunks.embedding.
+
+Usage (from Backend/):
+    python -m app.database.indexes status
+    python -m app.database.indexes create [--type hnsw|ivfflat]
+    python -m app.database.indexes rebuild [--type hnsw|ivfflat]
+    python -m app.database.indexes reindex
+    python -m app.database.indexes drop
+"""
+from typing import Optional
+from contextlib import asynccontextmanager
+from sqlalchemy import text
+from app.database.base import engine
+from app.config import settings
+import argparse
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+VECTOR_INDEX_NAME = "ix_document_chunks_embedding"
+
+# pg_advisory_lock key held while the index is created or dropped, so
+# workers starting together (or the CLI) never build it twice
+VECTOR_INDEX_LOCK_KEY = 0x5C4E3B
+
+@asynccontextmanager
+async def _autocommit():
+    # CONCURRENTLY operations cannot run inside a transaction block
+    async with engine.connect() as conn:
+        yield await conn.execution_options(isolation_level="AUTOCOMMIT")
+
+@asynccontextmanager
+async def _locked(wait: bool = True):
+    """Autocommit connection holding the index lock, or None if another
+    process holds it and wait is False"""
+    async with _autocommit() as conn:
+        if wait:
+            await conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": VECTOR_INDEX_LOCK_KEY})
+        elif not (await conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": VECTOR_INDEX_LOCK_KEY})).scalar():
+            yield None
+            return
+        try:
+            yield conn
+        finally:
+            await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": VECTOR_INDEX_LOCK_KEY})
+
+def index_definition(index_type: str) -> str:
+    """DDL for a cosine-distance index of the given type"""
+    if index_type == "hnsw":
+        method = "hnsw"
+        options = f"m = {settings.VECTOR_HNSW_M}, ef_construction = {settings.VECTOR_HNSW_EF_CONSTRUCTION}"
+    elif index_type == "ivfflat":
+        method = "ivfflat"
+        options = f"lists = {settings.VECTOR_IVFFLAT_LISTS}"
+    else:
+        raise ValueError(f"Unknown vector index type: {index_type}")
+    
+    return (
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {VECTOR_INDEX_NAME} "
+        f"ON document_chunks USING {method} (embedding vector_cosine_ops) WITH ({options})"
+    )
+
+async def _index_valid(conn) -> Optional[bool]:
+    """pg_index.indisvalid of the index, or None if it does not exist"""
+    return (await conn.execute(text("""
+        SELECT i.indisvalid FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE c.relname = :name
+    """), {"name": VECTOR_INDEX_NAME})).scalar()
+
+async def _drop(conn):
+    await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {VECTOR_INDEX_NAME}"))
+
+async def _create(conn, index_type: str):
+    valid = await _index_valid(conn)
+    if valid:
+        return
+    if valid is False:
+        # A failed or interrupted CONCURRENTLY build leaves an INVALID index
+        # that IF NOT EXISTS would keep forever; the planner never uses it
+        logger.warning("Vector index %s is INVALID; rebuilding it", VECTOR_INDEX_NAME)
+        await _drop(conn)
+    await conn.execute(text(f"SET maintenance_work_mem = '{settings.VECTOR_INDEX_MAINTENANCE_WORK_MEM}'"))
+    await conn.execute(text(index_definition(index_type)))
+
+async def create_vector_index(index_type: Optional[str] = None, wait: bool = True) -> bool:
+    """Create the vector index if it does not exist yet or is INVALID; returns
+    False without waiting if another process is building it and wait is False"""
+    index_type = index_type or settings.VECTOR_INDEX_TYPE
+    if index_type == "none":
+        return True
+    
+    async with _locked(wait) as conn:
+        if conn is None:
+            return False
+        await _create(conn, index_type)
+    return True
+
+async def ensure_vector_index():
+    """Startup hook: build the index in the background unless another process is"""
+    try:
+        if not await create_vector_index(wait=False):
+            logger.info("Vector index is being built by another process")
+    except Exception:
+        # `indexes status` shows the result; the next start retries
+        logger.exception("Could not create vector index")
+
+async def drop_vector_index():
+    """Drop the vector index without blocking reads and writes"""
+    async with _locked() as conn:
+        await _drop(conn)
+
+async def rebuild_vector_index(index_type: Optional[str] = None):
+    """Drop and recreate the index, e.g. to switch type or build parameters"""
+    index_type = index_type or settings.VECTOR_INDEX_TYPE
+    async with _locked() as conn:
+        await _drop(conn)
+        if index_type != "none":
+            await _create(conn, index_type)
+
+async def reindex_vector_index():
+    """Rebuild the existing index in place, e.g. after IVFFlat lists drift from the data"""
+    async with _autocommit() as conn:
+        await conn.execute(text(f"SET maintenance_work_mem = '{settings.VECTOR_INDEX_MAINTENANCE_WORK_MEM}'"))
+        await conn.execute(text(f"REINDEX INDEX CONCURRENTLY {VECTOR_INDEX_NAME}"))
+
+async def vector_index_status() -> Optional[dict]:
+    """Definition, size and validity of the index, or None if it does not exist"""
+    async with engine.connect() as conn:
+        row = (await conn.execute(text("""
+            SELECT pg_get_indexdef(i.indexrelid) AS definition,
+                   pg_size_pretty(pg_relation_size(i.indexrelid)) AS size,
+                   i.indisvalid AS valid
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE c.relname = :name
+        """), {"name": VECTOR_INDEX_NAME})).first()
+    
+    if row is None:
+        return None
+    return {"definition": row.definition, "size": row.size, "valid": row.valid}
+
+async def main():
+    parser = argparse.ArgumentParser(description="Manage the document_chunks vector index")
+    parser.add_argument("command", choices=["status", "create", "rebuild", "reindex", "drop"])
+    parser.add_argument("--type", choices=["hnsw", "ivfflat"], default=None)
+    args = parser.parse_args()
+    
+    if args.command == "create":
+        await create_vector_index(args.type)
+    elif args.command == "rebuild":
+        await rebuild_vector_index(args.type)
+    elif args.command == "reindex":
+        await reindex_vector_index()
+    elif args.command == "drop":
+        await drop_vector_index()
+    
+    print(await vector_index_status() or "No vector index")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
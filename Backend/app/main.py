@@ -1,61 +1,172 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from app.database.base import init_db
-from app.api import auth, documents, chat
-from app.config import settings
-
-app = FastAPI(
-    title="RAG API with Authentication",
-    version="3.0.0",
-    description="Secure RAG API with user authentication and PostgreSQL storage"
-)
-
-# CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(auth.router)
-app.include_router(documents.router)
-app.include_router(chat.router)
-
-@app.on_event("startup")
-async def startup_event():
-    """Initialize database on startup"""
-    init_db()
-
-@app.get("/")
-async def root():
-    return {
-        "message": "RAG API v3.0 with Authentication",
-        "status": "healthy",
-        "features": [
-            "User Authentication (JWT)",
-            "Document Upload (PDF/URL)",
-            "Vector Search (PostgreSQL + pgvector)",
-            "Chat History",
-            "Multi-user Support"
-        ],
-        "endpoints": {
-            "auth": "/api/auth/signup, /api/auth/login, /api/auth/me",
-            "documents": "/api/documents/upload-pdf, /api/documents/upload-url",
-            "chat": "/api/chat/query, /api/chat/sessions, /api/chat/history/{session_id}"
-        }
-    }
-
-@app.get("/health")
-async def health():
-    return {
-        "status": "healthy",
-        "database": "PostgreSQL with pgvector",
-        "embeddings": settings.EMBEDDING_MODEL
-    }
-
-if __name__ == "__main__":
-    import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from app.database.base import init_db, ping_db, engine
+from app.database.indexes import ensure_vector_index
+from app.api import auth, documents, chat
+from app.services.ingestion_service import ingestion_service
+from app.services.document_service import document_service
+from app.services.vector_service import vector_service
+from app.services.embedding_cache import embedding_cache
+from app.services.answer_cache import answer_cache
+from app.services.rerank_service import rerank_service
+from app.services.auth_cache import auth_cache
+from app.services.password_hasher import password_hasher, PasswordHasherBusy
+from app.services.embedding_pool import EmbeddingPoolBusy
+from app.config import settings
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+app = FastAPI(
+    title="RAG API with Authentication",
+    version="3.0.0",
+    description="Secure RAG API with user authentication and PostgreSQL storage"
+)
+
+# CORS
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+@app.exception_handler(EmbeddingPoolBusy)
+async def embedding_pool_busy_handler(request: Request, exc: EmbeddingPoolBusy):
+    """The embedding pool is saturated: ask the client to retry shortly"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Embedding service is busy, please retry"},
+        headers={"Retry-After": "1"}
+    )
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    """Too many signups/logins hashing at once: ask the client to retry shortly"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Too many sign-in attempts in progress, please retry"},
+        headers={"Retry-After": "1"}
+    )
+
+# Include routers
+app.include_router(auth.router)
+app.include_router(documents.router)
+app.include_router(chat.router)
+
+# Background model warm-up; /ready reports not ready until it finishes,
+# with the last error while failed attempts are being retried
+warmup_task = None
+warmup_error = None
+vector_index_task = None
+
+WARMUP_RETRY_INITIAL_SECONDS = 5.0
+WARMUP_RETRY_MAX_SECONDS = 300.0
+
+async def warm_up():
+    """Load the models and push one batch through each so first requests are fast;
+    failures (model download, out of memory) are retried with backoff"""
+    global warmup_error
+    started = time.perf_counter()
+    retry_delay = WARMUP_RETRY_INITIAL_SECONDS
+    while True:
+        try:
+            await vector_service.warm_up()
+            if settings.RERANK_ENABLED:
+                await rerank_service.warm_up()
+            break
+        except Exception as e:
+            warmup_error = repr(e)
+            logger.exception("Model warm-up failed; retrying in %gs", retry_delay)
+            await asyncio.sleep(retry_delay)
+            retry_delay = min(retry_delay * 2, WARMUP_RETRY_MAX_SECONDS)
+    warmup_error = None
+    logger.info("Models warm after %.1fs", time.perf_counter() - started)
+
+@app.on_event("startup")
+async def startup_event():
+    """Initialize database, embedding batcher and ingestion workers, start the vector index build, resume document purges and start model warm-up"""
+    global warmup_task, vector_index_task
+    await init_db()
+    # Building the index on a large table takes minutes; don't hold up startup
+    vector_index_task = asyncio.create_task(ensure_vector_index())
+    vector_service.batcher.start()
+    await ingestion_service.start()
+    document_service.schedule_purge()
+    
+    if settings.PRELOAD_MODELS:
+        warmup_task = asyncio.create_task(warm_up())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the vector index build, ingestion workers, the PDF parse and password hashing pools, the embedding batcher and the DB pool"""
+    if warmup_task is not None:
+        warmup_task.cancel()
+    if vector_index_task is not None:
+        # An interrupted build leaves an INVALID index; the next start rebuilds it
+        vector_index_task.cancel()
+    await ingestion_service.shutdown()
+    document_service.shutdown()
+    password_hasher.shutdown()
+    vector_service.batcher.stop()
+    await engine.dispose()
+
+@app.get("/")
+async def root():
+    return {
+        "message": "RAG API v3.0 with Authentication",
+        "status": "healthy",
+        "features": [
+            "User Authentication (JWT)",
+            "Document Upload (PDF/URL)",
+            "Background Ingestion Jobs",
+            "Vector Search (PostgreSQL + pgvector)",
+            "Chat History",
+            "Multi-user Support"
+        ],
+        "endpoints": {
+            "auth": "/api/auth/signup, /api/auth/login, /api/auth/me",
+            "documents": "/api/documents/upload-pdf, /api/documents/upload-urls, /api/documents/jobs/{job_id}",
+            "chat": "/api/chat/query, /api/chat/query/stream, /api/chat/sessions, /api/chat/history/{session_id}"
+        }
+    }
+
+@app.get("/health")
+async def health():
+    return {
+        "status": "healthy",
+        "database": "PostgreSQL with pgvector",
+        "embeddings": settings.EMBEDDING_MODEL
+    }
+
+@app.get("/ready")
+async def ready():
+    """Readiness probe: models warm (when preloading) and the DB pool connected"""
+    checks = {
+        "embedding_model": vector_service.warm or not settings.PRELOAD_MODELS,
+        "reranker": rerank_service.warm or not (settings.PRELOAD_MODELS and settings.RERANK_ENABLED),
+        "database": await ping_db()
+    }
+    is_ready = all(checks.values())
+    content = {"status": "ready" if is_ready else "starting", "checks": checks}
+    if warmup_error is not None and not is_ready:
+        content["warmup_error"] = warmup_error
+    return JSONResponse(status_code=200 if is_ready else 503, content=content)
+
+@app.get("/stats")
+async def stats():
+    return {
+        "embedding_cache": embedding_cache.stats(),
+        "answer_cache": answer_cache.stats(),
+        "rerank": rerank_service.stats(),
+        "auth_cache": auth_cache.stats(),
+        "password_hasher": password_hasher.stats()
+    }
+
+if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=settings.PORT)
\ No newline at end of file
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Text, Float, Index
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.sql import func
+from pgvector.sqlalchemy import Vector
+from app.database.base import Base
+from app.config import settings
+
+class CachedAnswer(Base):
+    __tablename__ = "answer_cache"
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    chunk_ids = Column(ARRAY(Integer), nullable=False)  # sorted ids of the retrieved chunks
+    document_ids = Column(ARRAY(Integer), nullable=False)  # documents behind those chunks
+    question = Column(Text, nullable=False)
+    query_embedding = Column(Vector(settings.EMBEDDING_DIMENSION), nullable=False)
+    answer = Column(Text, nullable=False)
+    generation_ms = Column(Float, default=0.0)  # LLM time a hit saves
+    hits = Column(Integer, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_answer_cache_user_chunks", "user_id", "chunk_ids"),
+        Index("ix_answer_cache_document_ids", "document_ids", postgresql_using="gin"),
+        Index("ix_answer_cache_user_id", "user_id", "id"),
+    )
@@ -1,44 +1,73 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON
-from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
-from pgvector.sqlalchemy import Vector
-from app.database.base import Base
-from app.config import settings
-
-
-class Document(Base):
-    __tablename__ = "documents"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    filename = Column(String, nullable=False)
-    source_type = Column(String)  # 'pdf' or 'url'
-    source_url = Column(String, nullable=True)
-    uploaded_at = Column(DateTime(timezone=True), server_default=func.now())
-
-    # 🔴 FIX HERE
-    meta_data = Column("metadata", JSON, default=dict)
-
-    # Relationships
-    owner = relationship("User", back_populates="documents")
-    chunks = relationship(
-        "DocumentChunk",
-        back_populates="document",
-        cascade="all, delete-orphan"
-    )
-
-
-class DocumentChunk(Base):
-    __tablename__ = "document_chunks"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False)
-    chunk_index = Column(Integer, nullable=False)
-    content = Column(Text, nullable=False)
-    embedding = Column(Vector(settings.EMBEDDING_DIMENSION))
-
-    # 🔴 FIX HERE
-    meta_data = Column("metadata", JSON, default=dict)
-
-    # Relationships
-    document = relationship("Document", back_populates="chunks")
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON, Index, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.sql import func
+from pgvector.sqlalchemy import Vector
+from app.database.base import Base
+from app.config import settings
+
+
+class Document(Base):
+    __tablename__ = "documents"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    filename = Column(String, nullable=False)
+    source_type = Column(String)  # 'pdf' or 'url'
+    source_url = Column(String, nullable=True)
+    uploaded_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Maintained when chunks are written, so listings don't count chunk rows
+    chunk_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Set while a large deleted document's chunks are purged in the background
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
+
+    # 🔴 FIX HERE
+    meta_data = Column("metadata", JSON, default=dict)
+
+    # Relationships
+    owner = relationship("User", back_populates="documents")
+    # Chunks go with the document row through ON DELETE CASCADE, never
+    # loaded and deleted one by one
+    chunks = relationship(
+        "DocumentChunk",
+        back_populates="document",
+        cascade="all, delete-orphan",
+        passive_deletes=True
+    )
+    
+    __table_args__ = (
+        Index("ix_documents_user_id", "user_id", "id"),
+    )
+
+
+class DocumentChunk(Base):
+    __tablename__ = "document_chunks"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    document_id = Column(Integer, ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
+    # Denormalized owner so vector search can filter tenants without a join
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    chunk_index = Column(Integer, nullable=False)
+    content = Column(Text, nullable=False)
+    # sha256 of content; lets re-ingestion keep unchanged chunks
+    content_hash = Column(String(64), nullable=True)
+    # Full-text form of content for lexical search, maintained by Postgres.
+    # Both are only read inside search SQL; loading them needs an explicit
+    # undefer(), so chunk rows loaded by the ORM never carry vectors
+    content_tsv = deferred(
+        Column(TSVECTOR, Computed("to_tsvector('english', content)", persisted=True)),
+        raiseload=True
+    )
+    embedding = deferred(Column(Vector(settings.EMBEDDING_DIMENSION)), raiseload=True)
+
+    # 🔴 FIX HERE
+    meta_data = Column("metadata", JSON, default=dict)
+
+    # Relationships
+    document = relationship("Document", back_populates="chunks")
+
+    __table_args__ = (
+        Index("ix_document_chunks_user_document", "user_id", "document_id"),
+        Index("ix_document_chunks_document_index", "document_id", "chunk_index"),
+        Index("ix_document_chunks_content_tsv", "content_tsv", postgresql_using="gin"),
+    )
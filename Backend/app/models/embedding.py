@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.sql import func
+from pgvector.sqlalchemy import Vector
+from app.database.base import Base
+from app.config import settings
+
+class CachedEmbedding(Base):
+    __tablename__ = "embedding_cache"
+    
+    model = Column(String, primary_key=True)
+    text_hash = Column(String(64), primary_key=True)  # sha256 of normalized text
+    embedding = Column(Vector(settings.EMBEDDING_DIMENSION), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
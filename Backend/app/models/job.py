@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, JSON
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.database.base import Base
+
+class IngestionJob(Base):
+    __tablename__ = "ingestion_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    source_type = Column(String, nullable=False)  # 'pdf' or 'url'
+    source = Column(String, nullable=False)  # spooled file path or URL
+    filename = Column(String, nullable=False)
+    incremental = Column(Boolean, nullable=False, default=False)  # update the previous document from this source
+    chunking = Column(JSON, nullable=True)  # chunk_size / chunk_overlap resolved at upload
+    status = Column(String, nullable=False, default="queued", index=True)  # queued, running, succeeded, failed
+    stage = Column(String, nullable=True)  # PDFs: processing; URLs: parsing, chunking, embedding, storing
+    progress_current = Column(Integer, default=0)
+    progress_total = Column(Integer, default=0)
+    attempts = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
+    result = Column(JSON, nullable=True)  # chunk counts: reused, recomputed, deleted
+    document_id = Column(Integer, ForeignKey("documents.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    
+    # Relationships
+    user = relationship("User")
@@ -1,30 +1,44 @@
-from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
-from datetime import datetime
-
-class UserCreate(BaseModel):
-    email: EmailStr
-    username: str = Field(..., min_length=3, max_length=50)
-    password: str = Field(..., min_length=8)
-
-class UserLogin(BaseModel):
-    email: EmailStr
-    password: str
-
-class Token(BaseModel):
-    access_token: str
-    token_type: str = "bearer"
-
-class TokenData(BaseModel):
-    user_id: Optional[int] = None
-    email: Optional[str] = None
-
-class UserResponse(BaseModel):
-    id: int
-    email: str
-    username: str
-    is_active: bool
-    created_at: datetime
-    
-    class Config:
-        from_attributes = True
\ No newline at end of file
+from pydantic import BaseModel, EmailStr, Field
+from typing import Optional
+from datetime import datetime
+
+class UserCreate(BaseModel):
+    email: EmailStr
+    username: str = Field(..., min_length=3, max_length=50)
+    password: str = Field(..., min_length=8)
+
+class UserLogin(BaseModel):
+    email: EmailStr
+    password: str
+
+class Token(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+
+class TokenData(BaseModel):
+    user_id: Optional[int] = None
+    email: Optional[str] = None
+
+class UserResponse(BaseModel):
+    id: int
+    email: str
+    username: str
+    is_active: bool
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class Principal(BaseModel):
+    """The authenticated user as get_current_user returns it: a cached snapshot, not a session object"""
+    id: int
+    email: str
+    username: str
+    is_active: bool
+    created_at: Optional[datetime] = None
+    chunk_size: Optional[int] = None
+    chunk_overlap: Optional[int] = None
+    
+    class Config:
+        from_attributes = True
+        frozen = True
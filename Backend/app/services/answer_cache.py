@@ -0,0 +1,126 @@
+from typing import Iterable, List, Optional
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, update, delete, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.answer import CachedAnswer
+from app.models.document import DocumentChunk
+from app.config import settings
+import threading
+import time
+
+class AnswerCache:
+    """Reuses LLM answers for near-duplicate questions over the same retrieved chunks"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.lookup_ms = 0.0
+        self.saved_ms = 0.0
+    
+    async def lookup(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        query_embedding: List[float],
+        chunks: List[DocumentChunk]
+    ) -> Optional[CachedAnswer]:
+        """Return the closest cached answer for exactly these chunks, if similar enough"""
+        if not settings.ANSWER_CACHE_ENABLED:
+            return None
+        
+        started = time.perf_counter()
+        distance = CachedAnswer.query_embedding.cosine_distance(query_embedding)
+        entry = await db.scalar(
+            select(CachedAnswer)
+            .where(
+                CachedAnswer.user_id == user_id,
+                CachedAnswer.chunk_ids == sorted(chunk.id for chunk in chunks),
+                distance <= 1 - settings.ANSWER_CACHE_SIMILARITY,
+                CachedAnswer.created_at >= self._expired_before()
+            )
+            .order_by(distance)
+            .limit(1)
+        )
+        if entry is not None:
+            await db.execute(
+                update(CachedAnswer)
+                .where(CachedAnswer.id == entry.id)
+                .values(hits=CachedAnswer.hits + 1)
+            )
+        
+        with self._lock:
+            self.lookup_ms += (time.perf_counter() - started) * 1000
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.saved_ms += entry.generation_ms or 0.0
+        return entry
+    
+    async def store(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        question: str,
+        query_embedding: List[float],
+        chunks: List[DocumentChunk],
+        answer: str,
+        generation_ms: float
+    ):
+        """Cache a generated answer, pruning the user's expired and surplus
+        entries; persisted with the caller's transaction"""
+        if not settings.ANSWER_CACHE_ENABLED:
+            return
+        
+        # Newest existing entry beyond the cap, counting the one added below
+        newest_surplus = (
+            select(CachedAnswer.id)
+            .where(CachedAnswer.user_id == user_id)
+            .order_by(CachedAnswer.id.desc())
+            .offset(max(settings.ANSWER_CACHE_MAX_PER_USER - 1, 0))
+            .limit(1)
+            .scalar_subquery()
+        )
+        await db.execute(
+            delete(CachedAnswer)
+            .where(
+                CachedAnswer.user_id == user_id,
+                or_(CachedAnswer.created_at < self._expired_before(), CachedAnswer.id <= newest_surplus)
+            )
+            .execution_options(synchronize_session=False)
+        )
+        
+        db.add(CachedAnswer(
+            user_id=user_id,
+            chunk_ids=sorted(chunk.id for chunk in chunks),
+            document_ids=sorted({chunk.document_id for chunk in chunks}),
+            question=question,
+            query_embedding=query_embedding,
+            answer=answer,
+            generation_ms=generation_ms
+        ))
+    
+    async def invalidate_documents(self, db: AsyncSession, document_ids: Iterable[int]):
+        """Drop answers built on any of these documents (deleted or re-ingested)"""
+        await db.execute(
+            delete(CachedAnswer).where(CachedAnswer.document_ids.overlap(list(document_ids)))
+        )
+    
+    @staticmethod
+    def _expired_before() -> datetime:
+        return datetime.now(timezone.utc) - timedelta(hours=settings.ANSWER_CACHE_MAX_AGE_HOURS)
+    
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "saved_ms": round(self.saved_ms, 1),
+                "avg_lookup_ms": round(self.lookup_ms / lookups, 2) if lookups else 0.0
+            }
+
+# Global instance
+answer_cache = AnswerCache()
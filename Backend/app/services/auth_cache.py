@@ -0,0 +1,117 @@
+from typing import Optional
+from collections import OrderedDict
+from app.schemas.auth import Principal
+from app.config import settings
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class AuthCache:
+    """Short-TTL caches for authentication: verified token payloads (in-process)
+    and user principals (in-process, or Redis when AUTH_CACHE_REDIS_URL is set)"""
+    
+    def __init__(self):
+        # token -> (payload, expires_at); user_id -> (principal, expires_at)
+        self._tokens = OrderedDict()
+        self._users = OrderedDict()
+        self._redis = None
+        self.hits = 0
+        self.misses = 0
+    
+    def get_token(self, token: str) -> Optional[dict]:
+        """Payload of a token verified earlier, if still cached"""
+        entry = self._tokens.get(token)
+        if entry is None:
+            return None
+        payload, expires_at = entry
+        if expires_at <= time.time():
+            del self._tokens[token]
+            return None
+        self._tokens.move_to_end(token)
+        return payload
+    
+    def put_token(self, token: str, payload: dict):
+        # Never serve a payload past the token's own expiry
+        expires_at = time.time() + settings.AUTH_TOKEN_CACHE_TTL
+        if "exp" in payload:
+            expires_at = min(expires_at, float(payload["exp"]))
+        self._tokens[token] = (payload, expires_at)
+        self._tokens.move_to_end(token)
+        self._evict(self._tokens)
+    
+    async def get_user(self, user_id: int) -> Optional[Principal]:
+        if settings.AUTH_CACHE_REDIS_URL:
+            principal = await self._redis_get(user_id)
+        else:
+            principal = self._memory_get(user_id)
+        
+        if principal is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return principal
+    
+    async def put_user(self, principal: Principal):
+        if settings.AUTH_CACHE_REDIS_URL:
+            await self._redis_call("setex", self._redis_key(principal.id), settings.AUTH_USER_CACHE_TTL, principal.model_dump_json())
+        else:
+            self._users[principal.id] = (principal, time.time() + settings.AUTH_USER_CACHE_TTL)
+            self._users.move_to_end(principal.id)
+            self._evict(self._users)
+    
+    async def invalidate_user(self, user_id: int):
+        """Forget a user after a change to their row (deactivation, profile or settings)"""
+        self._users.pop(user_id, None)
+        if settings.AUTH_CACHE_REDIS_URL:
+            await self._redis_call("delete", self._redis_key(user_id))
+    
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "redis" if settings.AUTH_CACHE_REDIS_URL else "memory",
+            "tokens": len(self._tokens),
+            "users": len(self._users),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+    
+    def _memory_get(self, user_id: int) -> Optional[Principal]:
+        entry = self._users.get(user_id)
+        if entry is None:
+            return None
+        principal, expires_at = entry
+        if expires_at <= time.time():
+            del self._users[user_id]
+            return None
+        self._users.move_to_end(user_id)
+        return principal
+    
+    async def _redis_get(self, user_id: int) -> Optional[Principal]:
+        data = await self._redis_call("get", self._redis_key(user_id))
+        return Principal.model_validate_json(data) if data else None
+    
+    async def _redis_call(self, method: str, *args):
+        """Run a Redis command; when Redis is unreachable, behave like a cache miss"""
+        try:
+            if self._redis is None:
+                # Imported here: Redis is optional and only needed for a shared cache
+                import redis.asyncio as redis
+                self._redis = redis.from_url(settings.AUTH_CACHE_REDIS_URL)
+            return await getattr(self._redis, method)(*args)
+        except Exception:
+            logger.warning("Auth cache Redis %s failed", method, exc_info=True)
+            return None
+    
+    @staticmethod
+    def _redis_key(user_id: int) -> str:
+        return f"auth:user:{user_id}"
+    
+    @staticmethod
+    def _evict(entries: OrderedDict):
+        while len(entries) > settings.AUTH_CACHE_SIZE:
+            entries.popitem(last=False)
+
+# Global instance
+auth_cache = AuthCache()
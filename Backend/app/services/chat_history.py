@@ -0,0 +1,131 @@
+from typing import List, Optional
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from langchain_core.language_models import BaseChatModel
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+from app.database.base import AsyncSessionLocal
+from app.models.chat import ChatSession, ChatMessage
+from app.config import settings
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", """You maintain a running summary of a conversation between a user and an assistant.
+Merge the new messages into the current summary. Keep facts, names, numbers, decisions
+and open questions; drop pleasantries. Reply with the updated summary only.
+
+Current summary:
+{summary}"""),
+    ("human", "New messages:\n{messages}")
+])
+
+def estimate_tokens(text: str) -> int:
+    # Rough count (~4 characters per token); only used to bound the prompt
+    return len(text) // 4 + 1
+
+class ChatHistoryService:
+    """Keeps the chat history sent to the LLM bounded: recent turns verbatim, older ones summarized"""
+    
+    def __init__(self):
+        self._tasks = set()
+        self._summarizing = set()
+    
+    async def recent_messages(self, db: AsyncSession, session_id: int) -> List[ChatMessage]:
+        """The last CHAT_HISTORY_MAX_TURNS turns that fit in CHAT_HISTORY_MAX_TOKENS, oldest first"""
+        result = await db.execute(
+            select(ChatMessage)
+            .where(ChatMessage.session_id == session_id)
+            .order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+            .limit(settings.CHAT_HISTORY_MAX_TURNS * 2)
+        )
+        
+        window = []
+        budget = settings.CHAT_HISTORY_MAX_TOKENS
+        for msg in result.scalars():
+            budget -= estimate_tokens(msg.content)
+            if budget < 0 and window:
+                break
+            window.append(msg)
+        
+        window.reverse()
+        return window
+    
+    async def load(self, db: AsyncSession, session: Optional[ChatSession]) -> list:
+        """Prompt history: the rolling summary (if any) followed by the recent window"""
+        if session is None:
+            return []
+        
+        history = []
+        if session.summary:
+            history.append(SystemMessage(content=f"Summary of the earlier conversation:\n{session.summary}"))
+        
+        for msg in await self.recent_messages(db, session.id):
+            if msg.role == "user":
+                history.append(HumanMessage(content=msg.content))
+            else:
+                history.append(AIMessage(content=msg.content))
+        return history
+    
+    def schedule_summary(self, session_id: int, llm: BaseChatModel):
+        """Update the session summary in the background, off the response path"""
+        if not settings.CHAT_SUMMARY_ENABLED or session_id in self._summarizing:
+            return
+        
+        self._summarizing.add(session_id)
+        task = asyncio.create_task(self._summarize(session_id, llm))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _summarize(self, session_id: int, llm: BaseChatModel):
+        try:
+            async with AsyncSessionLocal() as db:
+                await self.update_summary(db, session_id, llm)
+        except Exception:
+            logger.exception("Summarizing chat session %s failed", session_id)
+        finally:
+            self._summarizing.discard(session_id)
+    
+    async def update_summary(self, db: AsyncSession, session_id: int, llm: BaseChatModel):
+        """Fold messages that fell out of the recent window into the session summary"""
+        session = await db.get(ChatSession, session_id)
+        window = await self.recent_messages(db, session_id)
+        if session is None or not window:
+            return
+        
+        summarized_until = session.summarized_until_id or 0
+        result = await db.execute(
+            select(ChatMessage)
+            .where(
+                ChatMessage.session_id == session_id,
+                ChatMessage.id > summarized_until,
+                ChatMessage.id < window[0].id
+            )
+            .order_by(ChatMessage.created_at, ChatMessage.id)
+            .limit(settings.CHAT_SUMMARY_BATCH_MESSAGES)
+        )
+        older = result.scalars().all()
+        if not older:
+            return
+        
+        transcript = "\n".join(f"{msg.role}: {msg.content}" for msg in older)
+        response = await (SUMMARY_PROMPT | llm).ainvoke({
+            "summary": session.summary or "(none yet)",
+            "messages": transcript
+        })
+        
+        # Only apply if no other worker advanced the summary meanwhile
+        await db.execute(
+            update(ChatSession)
+            .where(
+                ChatSession.id == session_id,
+                ChatSession.summarized_until_id.is_not_distinct_from(session.summarized_until_id)
+            )
+            .values(summary=response.content, summarized_until_id=older[-1].id)
+        )
+        await db.commit()
+
+# Global instance
+chat_history_service = ChatHistoryService()
@@ -0,0 +1,105 @@
+from typing import Iterable, List
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.document import DocumentChunk
+from app.config import settings
+import hashlib
+import io
+import json
+import struct
+
+# Columns written for every chunk, in COPY order
+CHUNK_COLUMNS = ("document_id", "user_id", "chunk_index", "content", "content_hash", "embedding", "metadata")
+
+# PGCOPY binary header: signature, flags, header extension length
+COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+COPY_TRAILER = struct.pack(">h", -1)
+
+def content_hash(content: str) -> str:
+    """Hash identifying a chunk's exact text (same as sha256 over UTF-8 in Postgres)"""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+class ChunkWriter:
+    """Streams chunk rows into document_chunks in large batches"""
+    
+    async def write(self, db: AsyncSession, rows: Iterable[dict]) -> int:
+        """Insert chunk rows (dicts keyed by CHUNK_COLUMNS) in the session's transaction"""
+        batch_size = settings.CHUNK_INSERT_BATCH_SIZE
+        written = 0
+        batch = []
+        
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                written += await self._flush(db, batch)
+                batch = []
+        
+        if batch:
+            written += await self._flush(db, batch)
+        
+        return written
+    
+    async def _flush(self, db: AsyncSession, batch: List[dict]) -> int:
+        if settings.CHUNK_INSERT_METHOD == "copy":
+            await self._copy(db, batch)
+        else:
+            await self._insert_values(db, batch)
+        return len(batch)
+    
+    async def _copy(self, db: AsyncSession, batch: List[dict]):
+        """COPY ... FROM STDIN in binary format, vectors in pgvector's wire format"""
+        buffer = io.BytesIO()
+        buffer.write(COPY_HEADER)
+        for row in batch:
+            buffer.write(struct.pack(">h", len(CHUNK_COLUMNS)))
+            self._write_field(buffer, struct.pack(">i", row["document_id"]))
+            self._write_field(buffer, struct.pack(">i", row["user_id"]))
+            self._write_field(buffer, struct.pack(">i", row["chunk_index"]))
+            self._write_field(buffer, row["content"].encode("utf-8"))
+            self._write_field(buffer, (row.get("content_hash") or content_hash(row["content"])).encode("ascii"))
+            self._write_field(buffer, self._encode_vector(row["embedding"]))
+            self._write_field(buffer, json.dumps(row.get("metadata") or {}).encode("utf-8"))
+        buffer.write(COPY_TRAILER)
+        buffer.seek(0)
+        
+        # asyncpg connection bound to the session's current transaction
+        conn = await db.connection()
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_to_table(
+            "document_chunks",
+            source=buffer,
+            columns=list(CHUNK_COLUMNS),
+            format="binary"
+        )
+    
+    async def _insert_values(self, db: AsyncSession, batch: List[dict]):
+        """Multi-row INSERT ... VALUES via SQLAlchemy's insertmanyvalues batching"""
+        await db.execute(
+            insert(DocumentChunk.__table__),
+            [
+                {
+                    "document_id": row["document_id"],
+                    "user_id": row["user_id"],
+                    "chunk_index": row["chunk_index"],
+                    "content": row["content"],
+                    "content_hash": row.get("content_hash") or content_hash(row["content"]),
+                    "embedding": list(row["embedding"]),
+                    "metadata": row.get("metadata") or {}
+                }
+                for row in batch
+            ]
+        )
+    
+    @staticmethod
+    def _write_field(buffer: io.BytesIO, data: bytes):
+        buffer.write(struct.pack(">i", len(data)))
+        buffer.write(data)
+    
+    @staticmethod
+    def _encode_vector(embedding) -> bytes:
+        # pgvector binary format: dimensions (int16), unused (int16), float4 values
+        values = list(embedding)
+        return struct.pack(f">hh{len(values)}f", len(values), 0, *values)
+
+# Global instance
+chunk_writer = ChunkWriter()
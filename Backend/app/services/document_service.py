@@ -1,130 +1,512 @@
-from typing import List
-from sqlalchemy.orm import Session
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import PyPDFLoader, WebBaseLoader
-from app.models.document import Document, DocumentChunk
-from app.services.vector_service import vector_service
-import tempfile
-import os
-
-class DocumentService:
-    def __init__(self):
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200
-        )
-    
-    def process_pdf(
-        self, 
-        db: Session, 
-        user_id: int, 
-        file_path: str, 
-        filename: str
-    ) -> Document:
-        """Process PDF file and store in database"""
-        # Load PDF
-        loader = PyPDFLoader(file_path)
-        pages = loader.load()
-        
-        # Create document record
-        document = Document(
-            user_id=user_id,
-            filename=filename,
-            source_type="pdf",
-            metadata={"page_count": len(pages)}
-        )
-        db.add(document)
-        db.flush()
-        
-        # Split into chunks
-        chunks_data = self.text_splitter.split_documents(pages)
-        
-        # Generate embeddings
-        chunk_texts = [chunk.page_content for chunk in chunks_data]
-        embeddings = vector_service.generate_embeddings(chunk_texts)
-        
-        # Store chunks
-        for idx, (chunk_data, embedding) in enumerate(zip(chunks_data, embeddings)):
-            chunk = DocumentChunk(
-                document_id=document.id,
-                chunk_index=idx,
-                content=chunk_data.page_content,
-                embedding=embedding,
-                metadata={
-                    "page": chunk_data.metadata.get("page", None)
-                }
-            )
-            db.add(chunk)
-        
-        db.commit()
-        db.refresh(document)
-        
-        return document
-    
-    def process_url(
-        self,
-        db: Session,
-        user_id: int,
-        url: str
-    ) -> Document:
-        """Process URL and store in database"""
-        # Load URL content
-        loader = WebBaseLoader(url)
-        pages = loader.load()
-        
-        if not pages or not pages[0].page_content.strip():
-            raise ValueError("No content extracted from URL")
-        
-        # Create document record
-        document = Document(
-            user_id=user_id,
-            filename=url.split("/")[-1] or "webpage",
-            source_type="url",
-            source_url=url,
-            metadata={}
-        )
-        db.add(document)
-        db.flush()
-        
-        # Split into chunks
-        chunks_data = self.text_splitter.split_documents(pages)
-        
-        # Generate embeddings
-        chunk_texts = [chunk.page_content for chunk in chunks_data]
-        embeddings = vector_service.generate_embeddings(chunk_texts)
-        
-        # Store chunks
-        for idx, (chunk_data, embedding) in enumerate(zip(chunks_data, embeddings)):
-            chunk = DocumentChunk(
-                document_id=document.id,
-                chunk_index=idx,
-                content=chunk_data.page_content,
-                embedding=embedding,
-                metadata={}
-            )
-            db.add(chunk)
-        
-        db.commit()
-        db.refresh(document)
-        
-        return document
-    
-    def get_user_documents(self, db: Session, user_id: int) -> List[Document]:
-        """Get all documents for a user"""
-        return db.query(Document).filter(Document.user_id == user_id).all()
-    
-    def delete_document(self, db: Session, document_id: int, user_id: int) -> bool:
-        """Delete a document and its chunks"""
-        document = db.query(Document).filter(
-            Document.id == document_id,
-            Document.user_id == user_id
-        ).first()
-        
-        if not document:
-            return False
-        
-        db.delete(document)
-        db.commit()
-        return True
-
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, List, NamedTuple, Optional, Tuple
+from collections import defaultdict, deque
+from contextlib import aclosing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from sqlalchemy import select, update, delete, func, any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from langchain_core.documents import Document as PageDocument
+from pypdf import PdfReader
+from bs4 import BeautifulSoup
+from app.database.base import AsyncSessionLocal
+from app.models.document import Document, DocumentChunk
+from app.services.vector_service import vector_service
+from app.services.url_fetcher import url_fetcher
+from app.services.chunk_writer import chunk_writer, content_hash
+from app.services import pdf_parser
+from app.services.text_splitter import ChunkingParams, resolve_chunking, split_pages
+from app.services.answer_cache import answer_cache
+from app.config import settings
+import asyncio
+import logging
+import multiprocessing
+
+logger = logging.getLogger(__name__)
+
+# Backoff between purge passes that left documents behind (database errors)
+PURGE_RETRY_INITIAL_SECONDS = 5.0
+PURGE_RETRY_MAX_SECONDS = 600.0
+
+# Progress callback: (stage, current, total)
+ProgressCallback = Callable[[str, int, int], Awaitable[None]]
+
+# Existing chunk rows of a document being re-ingested, by content hash
+StoredChunks = Dict[str, Deque[Row]]
+
+class IngestResult(NamedTuple):
+    document: Document
+    chunks_reused: int  # unchanged chunks that kept their rows and embeddings
+    chunks_recomputed: int  # new or edited chunks that were embedded and inserted
+    chunks_deleted: int  # chunks of the previous version that no longer exist
+
+class DocumentService:
+    def __init__(self):
+        self._parse_executor = None
+        self._purge_task = None
+        self._purge_requested = False
+    
+    async def process_pdf(
+        self, 
+        db: AsyncSession, 
+        user_id: int, 
+        file_path: str, 
+        filename: str,
+        progress: Optional[ProgressCallback] = None,
+        incremental: bool = False,
+        chunking: Optional[ChunkingParams] = None
+    ) -> IngestResult:
+        """Process PDF file and store in database, a batch of pages at a time"""
+        chunking = chunking or resolve_chunking()
+        with open(file_path, "rb") as pdf_file:
+            reader = await asyncio.to_thread(pdf_parser.open_pdf, pdf_file)
+            
+            document, stored = await self._prepare_document(
+                db,
+                incremental,
+                user_id=user_id,
+                filename=filename,
+                source_type="pdf",
+                meta_data={"page_count": len(reader.pages), "chunking": chunking._asdict()}
+            )
+            reused, recomputed = await self._store_pdf_pages(
+                db, document, file_path, reader, chunking, stored, progress
+            )
+        
+        return await self._finish(db, document, stored, reused, recomputed)
+    
+    async def _store_pdf_pages(
+        self,
+        db: AsyncSession,
+        document: Document,
+        file_path: str,
+        reader: PdfReader,
+        chunking: ChunkingParams,
+        stored: StoredChunks,
+        progress: Optional[ProgressCallback] = None
+    ) -> Tuple[int, int]:
+        """Split, embed and store one page batch before reading the next, so memory
+        stays bounded by the batch size rather than the document"""
+        page_count = len(reader.pages)
+        chunk_index = 0
+        reused = recomputed = 0
+        
+        await self._report(progress, "processing", 0, page_count)
+        async with aclosing(self._chunk_batches(file_path, reader, page_count, chunking)) as batches:
+            async for pages_done, chunks_data in batches:
+                batch_reused, batch_recomputed = await self._store_chunks(
+                    db, document, chunks_data, chunk_index, stored
+                )
+                reused += batch_reused
+                recomputed += batch_recomputed
+                chunk_index += len(chunks_data)
+                await self._report(progress, "processing", pages_done, page_count)
+        
+        return reused, recomputed
+    
+    async def _chunk_batches(
+        self,
+        file_path: str,
+        reader: PdfReader,
+        page_count: int,
+        chunking: ChunkingParams
+    ) -> AsyncIterator[Tuple[int, List[PageDocument]]]:
+        """Yield (pages done, chunks) in page order, a batch of pages at a time;
+        pages are parsed and split in the pool if enabled"""
+        ranges = pdf_parser.page_ranges(page_count, settings.INGESTION_PAGE_BATCH_SIZE)
+        workers = settings.PDF_PARSE_WORKERS
+        if workers <= 1:
+            for start, end in ranges:
+                yield end, await asyncio.to_thread(pdf_parser.chunk_pages, reader, start, end, chunking)
+            return
+        
+        # Keep a few ranges per worker in flight and hand them out in page order
+        loop = asyncio.get_running_loop()
+        executor = self.get_parse_executor()
+        pending = deque()
+        try:
+            for start, end in ranges:
+                future = loop.run_in_executor(executor, pdf_parser.extract_chunks, file_path, start, end, chunking)
+                pending.append((end, future))
+                if len(pending) >= 2 * workers:
+                    end, future = pending.popleft()
+                    yield end, await future
+            while pending:
+                end, future = pending.popleft()
+                yield end, await future
+        except BrokenProcessPool:
+            # A worker died (OOM, crash in a parser). The pool stays broken, so
+            # replace it for the next job and fail this one: retrying the same
+            # PDF would most likely take down the new pool as well
+            logger.error("PDF parse worker died while parsing %s; restarting the pool", file_path)
+            self._discard_parse_executor(executor)
+            raise RuntimeError("PDF parser process crashed on this file") from None
+        finally:
+            for _, future in pending:
+                future.cancel()
+    
+    def get_parse_executor(self) -> ProcessPoolExecutor:
+        """Process pool that extracts and splits PDF page ranges"""
+        if self._parse_executor is None:
+            # spawn: forking the threaded server process is not safe
+            self._parse_executor = ProcessPoolExecutor(
+                max_workers=settings.PDF_PARSE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._parse_executor
+    
+    def _discard_parse_executor(self, executor: ProcessPoolExecutor):
+        if self._parse_executor is executor:
+            self._parse_executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    def shutdown(self):
+        """Stop the PDF parse pool and the purge task, if they were started;
+        an unfinished purge resumes on next start"""
+        if self._parse_executor is not None:
+            self._parse_executor.shutdown(cancel_futures=True)
+            self._parse_executor = None
+        if self._purge_task is not None:
+            self._purge_task.cancel()
+            self._purge_task = None
+    
+    async def process_url(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        url: str,
+        progress: Optional[ProgressCallback] = None,
+        html: Optional[str] = None,
+        incremental: bool = False,
+        chunking: Optional[ChunkingParams] = None
+    ) -> IngestResult:
+        """Process URL (or its already fetched HTML) and store in database"""
+        chunking = chunking or resolve_chunking()
+        # Load URL content
+        await self._report(progress, "parsing", 0, 0)
+        if html is None:
+            html = await asyncio.wrap_future(url_fetcher.submit(url))
+        pages = await asyncio.to_thread(self._parse_html, url, html)
+        
+        if not pages or not pages[0].page_content.strip():
+            raise ValueError("No content extracted from URL")
+        
+        document, stored = await self._prepare_document(
+            db,
+            incremental,
+            user_id=user_id,
+            filename=url.split("/")[-1] or "webpage",
+            source_type="url",
+            source_url=url,
+            meta_data={"chunking": chunking._asdict()}
+        )
+        
+        # Split into chunks
+        await self._report(progress, "chunking", 0, len(pages))
+        chunks_data = await asyncio.to_thread(split_pages, pages, chunking)
+        
+        reused, recomputed = await self._store_chunks(db, document, chunks_data, 0, stored, progress)
+        
+        return await self._finish(db, document, stored, reused, recomputed)
+    
+    async def _prepare_document(
+        self,
+        db: AsyncSession,
+        incremental: bool,
+        **fields
+    ) -> Tuple[Document, StoredChunks]:
+        """Create the Document, or in incremental mode reuse the latest one from
+        the same source (filename for PDFs, URL for web pages) with its chunks"""
+        document = None
+        if incremental:
+            source = (
+                Document.source_url == fields["source_url"]
+                if fields["source_type"] == "url"
+                else Document.filename == fields["filename"]
+            )
+            result = await db.execute(
+                select(Document)
+                .where(
+                    Document.user_id == fields["user_id"],
+                    Document.source_type == fields["source_type"],
+                    Document.deleted_at.is_(None),
+                    source
+                )
+                .order_by(Document.id.desc())
+                .limit(1)
+                .with_for_update()  # concurrent re-uploads of one source run one after the other
+            )
+            document = result.scalar_one_or_none()
+        
+        if document is None:
+            document = Document(**fields)
+            db.add(document)
+            await db.flush()
+            return document, {}
+        
+        document.meta_data = fields["meta_data"]
+        result = await db.execute(
+            select(DocumentChunk.id, DocumentChunk.content_hash, DocumentChunk.chunk_index, DocumentChunk.meta_data)
+            .where(DocumentChunk.document_id == document.id)
+            .order_by(DocumentChunk.chunk_index)
+        )
+        stored = defaultdict(deque)
+        for row in result:
+            stored[row.content_hash].append(row)
+        return document, stored
+    
+    async def _store_chunks(
+        self,
+        db: AsyncSession,
+        document: Document,
+        chunks_data: List[PageDocument],
+        first_index: int,
+        stored: StoredChunks,
+        progress: Optional[ProgressCallback] = None
+    ) -> Tuple[int, int]:
+        """Embed and insert chunks, keeping the rows of chunks already stored; returns (reused, recomputed)"""
+        fresh = []
+        moved = []
+        for idx, chunk_data in enumerate(chunks_data, start=first_index):
+            chunk_hash = content_hash(chunk_data.page_content)
+            metadata = {"page": chunk_data.metadata["page"]} if "page" in chunk_data.metadata else {}
+            
+            rows = stored.get(chunk_hash)
+            if rows:
+                row = rows.popleft()
+                if row.chunk_index != idx or row.meta_data != metadata:
+                    moved.append({"id": row.id, "chunk_index": idx, "meta_data": metadata})
+            else:
+                fresh.append((idx, chunk_data.page_content, chunk_hash, metadata))
+        
+        if moved:
+            await db.execute(update(DocumentChunk), moved)
+        
+        # Generate embeddings
+        embeddings = await self._embed(db, [content for _, content, _, _ in fresh], progress)
+        
+        # Store chunks
+        await self._report(progress, "storing", 0, len(fresh))
+        await chunk_writer.write(db, (
+            {
+                "document_id": document.id,
+                "user_id": document.user_id,
+                "chunk_index": idx,
+                "content": content,
+                "content_hash": chunk_hash,
+                "embedding": embedding,
+                "metadata": metadata
+            }
+            for (idx, content, chunk_hash, metadata), embedding in zip(fresh, embeddings)
+        ))
+        
+        return len(chunks_data) - len(fresh), len(fresh)
+    
+    async def _finish(
+        self,
+        db: AsyncSession,
+        document: Document,
+        stored: StoredChunks,
+        reused: int,
+        recomputed: int
+    ) -> IngestResult:
+        """Drop chunks the new version no longer has and commit"""
+        vanished = [row.id for rows in stored.values() for row in rows]
+        if vanished:
+            await db.execute(
+                delete(DocumentChunk).where(
+                    DocumentChunk.id == any_(bindparam("ids", vanished, type_=ARRAY(DocumentChunk.id.type)))
+                ).execution_options(synchronize_session=False)
+            )
+        if stored:
+            await answer_cache.invalidate_documents(db, [document.id])
+        
+        document.chunk_count = reused + recomputed
+        await db.commit()
+        
+        return IngestResult(document, reused, recomputed, len(vanished))
+    
+    @staticmethod
+    def _parse_html(url: str, html: str) -> List[PageDocument]:
+        """Extract page text and metadata the same way WebBaseLoader does"""
+        soup = BeautifulSoup(html, "html.parser")
+        metadata = {"source": url}
+        if soup.title and soup.title.string:
+            metadata["title"] = soup.title.string.strip()
+        description = soup.find("meta", attrs={"name": "description"})
+        if description and description.get("content"):
+            metadata["description"] = description["content"]
+        
+        return [PageDocument(page_content=soup.get_text(), metadata=metadata)]
+    
+    async def _embed(
+        self,
+        db: AsyncSession,
+        texts: List[str],
+        progress: Optional[ProgressCallback] = None
+    ) -> List[List[float]]:
+        """Generate embeddings in batches, reporting progress between batches"""
+        batch_size = settings.INGESTION_EMBED_BATCH_SIZE
+        embeddings = []
+        
+        await self._report(progress, "embedding", 0, len(texts))
+        for start in range(0, len(texts), batch_size):
+            embeddings.extend(
+                await vector_service.generate_embeddings(texts[start:start + batch_size], db)
+            )
+            await self._report(progress, "embedding", len(embeddings), len(texts))
+        
+        return embeddings
+    
+    @staticmethod
+    async def _report(progress: Optional[ProgressCallback], stage: str, current: int, total: int):
+        if progress is not None:
+            await progress(stage, current, total)
+    
+    async def get_user_documents(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        limit: int,
+        before_id: Optional[int] = None
+    ) -> List[Document]:
+        """A page of the user's documents, newest first, starting after before_id"""
+        query = select(Document).where(Document.user_id == user_id, Document.deleted_at.is_(None))
+        if before_id is not None:
+            query = query.where(Document.id < before_id)
+        result = await db.execute(query.order_by(Document.id.desc()).limit(limit))
+        return result.scalars().all()
+    
+    async def delete_document(self, db: AsyncSession, document_id: int, user_id: int) -> bool:
+        """Delete a document and its chunks"""
+        deleted, purging = await self.delete_documents(db, [document_id], user_id)
+        return bool(deleted or purging)
+    
+    async def delete_documents(
+        self,
+        db: AsyncSession,
+        document_ids: List[int],
+        user_id: int
+    ) -> Tuple[List[int], List[int]]:
+        """Delete the user's documents; returns (deleted, purging).
+        
+        Documents are deleted with one statement and their chunks follow
+        through ON DELETE CASCADE, up to DOCUMENT_DELETE_MAX_CHUNKS chunks in
+        total. Past that, documents are hidden right away and their chunks
+        purged in the background so no transaction locks millions of rows.
+        """
+        result = await db.execute(
+            select(Document.id, Document.chunk_count)
+            .where(
+                Document.id == any_(bindparam("ids", document_ids, type_=ARRAY(Document.id.type))),
+                Document.user_id == user_id,
+                Document.deleted_at.is_(None)
+            )
+            .order_by(Document.chunk_count)
+            .with_for_update()
+        )
+        found = result.all()
+        if not found:
+            return [], []
+        
+        deleted, purging = [], []
+        budget = settings.DOCUMENT_DELETE_MAX_CHUNKS
+        for row in found:
+            if row.chunk_count <= budget:
+                budget -= row.chunk_count
+                deleted.append(row.id)
+            else:
+                purging.append(row.id)
+        
+        await answer_cache.invalidate_documents(db, [row.id for row in found])
+        if deleted:
+            await db.execute(
+                delete(Document)
+                .where(Document.id == any_(bindparam("ids", deleted, type_=ARRAY(Document.id.type))))
+                .execution_options(synchronize_session=False)
+            )
+        if purging:
+            await db.execute(
+                update(Document)
+                .where(Document.id == any_(bindparam("ids", purging, type_=ARRAY(Document.id.type))))
+                .values(deleted_at=func.now())
+                .execution_options(synchronize_session=False)
+            )
+        await db.commit()
+        
+        if purging:
+            self.schedule_purge()
+        return deleted, purging
+    
+    def schedule_purge(self):
+        """Purge documents marked deleted in the background; also resumes purges after a restart"""
+        self._purge_requested = True
+        if self._purge_task is None or self._purge_task.done():
+            self._purge_task = asyncio.create_task(self._purge())
+    
+    async def _purge(self):
+        retry_delay = PURGE_RETRY_INITIAL_SECONDS
+        while self._purge_requested:
+            self._purge_requested = False
+            failed = False
+            try:
+                async with AsyncSessionLocal() as db:
+                    result = await db.execute(
+                        select(Document.id).where(Document.deleted_at.is_not(None)).order_by(Document.id)
+                    )
+                    document_ids = result.scalars().all()
+            except Exception:
+                logger.exception("Listing documents to purge failed")
+                document_ids, failed = [], True
+            
+            # One failing document must not hold up the others
+            for document_id in document_ids:
+                try:
+                    await self.purge_document(document_id)
+                except Exception:
+                    logger.exception("Purging document %s failed", document_id)
+                    failed = True
+            
+            if failed:
+                logger.warning("Retrying the document purge in %gs", retry_delay)
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, PURGE_RETRY_MAX_SECONDS)
+                self._purge_requested = True
+            else:
+                retry_delay = PURGE_RETRY_INITIAL_SECONDS
+    
+    async def purge_document(self, document_id: int) -> int:
+        """Delete a document's chunks DOCUMENT_PURGE_BATCH_SIZE rows per transaction,
+        then the document; returns the number of chunks deleted"""
+        purged = 0
+        async with AsyncSessionLocal() as db:
+            while True:
+                # SKIP LOCKED: another process purging the same document takes other rows
+                batch = (
+                    select(DocumentChunk.id)
+                    .where(DocumentChunk.document_id == document_id)
+                    .limit(settings.DOCUMENT_PURGE_BATCH_SIZE)
+                    .with_for_update(skip_locked=True)
+                    .scalar_subquery()
+                )
+                result = await db.execute(
+                    delete(DocumentChunk)
+                    .where(DocumentChunk.id.in_(batch))
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+                if not result.rowcount:
+                    break
+                purged += result.rowcount
+            
+            await db.execute(
+                delete(Document)
+                .where(Document.id == document_id)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        logger.info("Purged document %s (%d chunks)", document_id, purged)
+        return purged
+
 document_service = DocumentService()
\ No newline at end of file
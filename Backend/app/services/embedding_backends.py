@@ -0,0 +1,67 @@
+from typing import TYPE_CHECKING, List
+from app.config import settings
+import logging
+import os
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+logger = logging.getLogger(__name__)
+
+# EMBEDDING_BACKEND values
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+def quantized_file_name() -> str:
+    return f"onnx/model_qint8_{settings.EMBEDDING_QUANTIZATION}.onnx"
+
+def embedding_model_key() -> str:
+    """Identifies the vectors the configured model produces: backends and int8 configs differ slightly"""
+    key = f"{settings.EMBEDDING_MODEL}:{settings.EMBEDDING_BACKEND}"
+    if settings.EMBEDDING_BACKEND == "onnx-int8":
+        key += f":{settings.EMBEDDING_QUANTIZATION}"
+    return key
+
+def load_embedding_model(backend: str = None, model_name: str = None) -> "SentenceTransformer":
+    """Load the embedding model on the given backend (defaults from Settings)"""
+    # Imported here: sentence-transformers pulls in torch, which dominates import time
+    from sentence_transformers import SentenceTransformer
+    
+    backend = backend or settings.EMBEDDING_BACKEND
+    model_name = model_name or settings.EMBEDDING_MODEL
+    
+    if backend == "torch":
+        return SentenceTransformer(model_name)
+    if backend == "onnx":
+        # Uses the repo's onnx/model.onnx, exporting from PyTorch if it has none
+        return SentenceTransformer(model_name, backend="onnx")
+    if backend == "onnx-int8":
+        return _load_quantized(model_name)
+    raise ValueError(f"Unknown EMBEDDING_BACKEND {backend!r}; expected one of {BACKENDS}")
+
+def encode_texts(model: "SentenceTransformer", texts: List[str]) -> List[List[float]]:
+    """Normalized embeddings as plain lists (cosine distance == 1 - dot product)"""
+    embeddings = model.encode(
+        texts,
+        batch_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+        normalize_embeddings=True
+    )
+    return embeddings.tolist()
+
+def _load_quantized(model_name: str) -> "SentenceTransformer":
+    """Load a dynamically int8-quantized ONNX model, quantizing it once if needed"""
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+    
+    file_name = quantized_file_name()
+    try:
+        # Many hub models ship pre-quantized variants
+        return SentenceTransformer(model_name, backend="onnx", model_kwargs={"file_name": file_name})
+    except Exception:
+        logger.info("No %s on the hub for %s; quantizing locally", file_name, model_name)
+    
+    local_path = os.path.join(settings.EMBEDDING_ONNX_DIR, model_name.replace("/", "__"))
+    if not os.path.exists(os.path.join(local_path, file_name)):
+        model = SentenceTransformer(model_name, backend="onnx")
+        model.save(local_path)
+        export_dynamic_quantized_onnx_model(model, settings.EMBEDDING_QUANTIZATION, local_path)
+    
+    return SentenceTransformer(local_path, backend="onnx", model_kwargs={"file_name": file_name})
@@ -0,0 +1,114 @@
+from typing import Callable, List, Optional
+from concurrent.futures import Future
+from app.config import settings
+import asyncio
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class _Request:
+    __slots__ = ("texts", "future")
+    
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.future = Future()
+
+class EmbeddingBatcher:
+    """Coalesces concurrent embedding requests into a few large encode calls on a dedicated thread"""
+    
+    def __init__(self, encode: Callable[[List[str]], List[List[float]]]):
+        self._encode = encode
+        self._queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+    
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="embedding-batcher",
+                    daemon=True
+                )
+                self._thread.start()
+    
+    def stop(self):
+        with self._lock:
+            if self._thread is not None:
+                self._queue.put(None)
+                self._thread.join(timeout=5)
+                self._thread = None
+    
+    def submit(self, texts: List[str]) -> Future:
+        """Queue texts for encoding; the future resolves to their embeddings"""
+        request = _Request(list(texts))
+        if not request.texts:
+            request.future.set_result([])
+            return request.future
+        
+        self.start()
+        self._queue.put(request)
+        return request.future
+    
+    def encode(self, texts: List[str]) -> List[List[float]]:
+        """Blocking helper for worker threads"""
+        return self.submit(texts).result()
+    
+    async def aencode(self, texts: List[str]) -> List[List[float]]:
+        """Awaitable helper for the event loop"""
+        return await asyncio.wrap_future(self.submit(texts))
+    
+    def _collect(self, first: _Request) -> List[_Request]:
+        """Gather more requests until the batch is full or the wait expires"""
+        pending = [first]
+        count = len(first.texts)
+        deadline = time.monotonic() + settings.EMBEDDING_BATCH_MAX_WAIT_MS / 1000
+        
+        while count < settings.EMBEDDING_BATCH_MAX_SIZE:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if request is None:
+                # Stop requested; finish this batch first
+                self._queue.put(None)
+                break
+            pending.append(request)
+            count += len(request.texts)
+        
+        return pending
+    
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            
+            # Callers cancelled while queued (client gone, wait_for timeout) are
+            # dropped; the rest can no longer be cancelled and always get a result
+            pending = [
+                request for request in self._collect(first)
+                if request.future.set_running_or_notify_cancel()
+            ]
+            if not pending:
+                continue
+            texts = [text for request in pending for text in request.texts]
+            
+            try:
+                embeddings = self._encode(texts)
+            except Exception as e:
+                logger.exception("Embedding batch of %d texts failed", len(texts))
+                for request in pending:
+                    request.future.set_exception(e)
+                continue
+            
+            offset = 0
+            for request in pending:
+                request.future.set_result(embeddings[offset:offset + len(request.texts)])
+                offset += len(request.texts)
@@ -0,0 +1,110 @@
+from typing import Dict, List, Optional
+from collections import OrderedDict
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert
+from app.database.base import AsyncSessionLocal
+from app.models.embedding import CachedEmbedding
+from app.services.embedding_backends import embedding_model_key
+from app.config import settings
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingCache:
+    """Content-addressed embedding cache: in-process LRU backed by the embedding_cache table"""
+    
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.store_hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def text_hash(text: str) -> str:
+        """Hash of the whitespace-normalized text"""
+        normalized = " ".join(text.split())
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+    
+    async def get_many(self, db: Optional[AsyncSession], hashes: List[str]) -> Dict[str, List[float]]:
+        """Return cached embeddings for the given hashes; missing hashes are left out"""
+        model = embedding_model_key()
+        found = {}
+        
+        with self._lock:
+            for text_hash in hashes:
+                embedding = self._entries.get((model, text_hash))
+                if embedding is not None:
+                    self._entries.move_to_end((model, text_hash))
+                    found[text_hash] = embedding
+            self.memory_hits += len(found)
+        
+        missing = [text_hash for text_hash in hashes if text_hash not in found]
+        if missing and db is not None and settings.EMBEDDING_CACHE_PERSIST:
+            result = await db.execute(
+                select(CachedEmbedding.text_hash, CachedEmbedding.embedding).where(
+                    CachedEmbedding.model == model,
+                    CachedEmbedding.text_hash.in_(missing)
+                )
+            )
+            rows = result.all()
+            stored = {text_hash: list(map(float, embedding)) for text_hash, embedding in rows}
+            self._remember(model, stored)
+            found.update(stored)
+            with self._lock:
+                self.store_hits += len(stored)
+        
+        with self._lock:
+            self.misses += len(hashes) - len(found)
+        
+        return found
+    
+    async def put_many(self, embeddings: Dict[str, List[float]], persist: bool = True):
+        """Cache freshly computed embeddings, in memory and (if persist) in the table"""
+        if not embeddings:
+            return
+        
+        model = embedding_model_key()
+        self._remember(model, embeddings)
+        
+        if persist and settings.EMBEDDING_CACHE_PERSIST:
+            # Own short transaction: inside an ingestion's long one, uncommitted
+            # keys would block concurrent ingestions of the same boilerplate.
+            # Sorted keys make concurrent writers lock them in the same order
+            try:
+                async with AsyncSessionLocal() as cache_db:
+                    await cache_db.execute(
+                        insert(CachedEmbedding).values([
+                            {"model": model, "text_hash": text_hash, "embedding": embeddings[text_hash]}
+                            for text_hash in sorted(embeddings)
+                        ]).on_conflict_do_nothing(index_elements=["model", "text_hash"])
+                    )
+                    await cache_db.commit()
+            except Exception:
+                # The table is only a cache; the embeddings are still returned
+                logger.warning("Could not persist %d cached embeddings", len(embeddings), exc_info=True)
+    
+    def _remember(self, model: str, embeddings: Dict[str, List[float]]):
+        with self._lock:
+            for text_hash, embedding in embeddings.items():
+                self._entries[(model, text_hash)] = embedding
+                self._entries.move_to_end((model, text_hash))
+            while len(self._entries) > settings.EMBEDDING_CACHE_SIZE:
+                self._entries.popitem(last=False)
+    
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.memory_hits + self.store_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "memory_hits": self.memory_hits,
+                "store_hits": self.store_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.store_hits) / lookups if lookups else 0.0
+            }
+
+# Global instance
+embedding_cache = EmbeddingCache()
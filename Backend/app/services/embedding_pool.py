@@ -0,0 +1,238 @@
+"""Process pool that serves embeddings to API processes over a local socket.
+
+Run it next to the API (from Backend/):
+    python -m app.services.embedding_pool
+
+and point the API at it with EMBEDDING_POOL_ADDRESS; both sides need the
+same EMBEDDING_POOL_AUTHKEY. Each worker process loads its own copy of the
+model, so memory grows with EMBEDDING_POOL_WORKERS rather than with the
+number of API processes, which only hold a connection.
+"""
+from typing import Dict, List, Optional, Tuple, Union
+from concurrent.futures import Future
+from multiprocessing.connection import Client, Connection, Listener
+from app.config import settings
+import itertools
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingPoolBusy(RuntimeError):
+    """The pool's queue stayed full; the caller should back off and retry"""
+
+class EmbeddingPoolError(RuntimeError):
+    """A pool worker failed to encode the batch"""
+
+def parse_address(address: str) -> Union[Tuple[str, int], str]:
+    """'host:port' -> TCP address, anything else -> unix socket path"""
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit():
+        return (host or "127.0.0.1", int(port))
+    return address
+
+def _authkey() -> bytes:
+    # Its own key rather than SECRET_KEY: whoever can reach the pool must
+    # not also learn what signs the API's tokens
+    if not settings.EMBEDDING_POOL_AUTHKEY:
+        raise EmbeddingPoolError("EMBEDDING_POOL_AUTHKEY must be set to use the embedding pool")
+    return settings.EMBEDDING_POOL_AUTHKEY.encode("utf-8")
+
+def _worker_main(index: int, tasks, results, torch_threads: int):
+    """Worker process: load the model once, then encode batches until told to stop"""
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+    
+    from app.services.embedding_backends import load_embedding_model, encode_texts
+    model = load_embedding_model()
+    
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        conn_id, request_id, texts = task
+        # Lets the server fail this request if the process dies while encoding
+        results.put((index, conn_id, request_id, "started", None))
+        try:
+            results.put((index, conn_id, request_id, "ok", encode_texts(model, texts)))
+        except Exception as e:
+            results.put((index, conn_id, request_id, "error", repr(e)))
+
+class EmbeddingPoolServer:
+    """Accepts client connections and fans their batches out to worker processes"""
+    
+    def __init__(self, address: str, workers: int, queue_size: int):
+        self.address = parse_address(address)
+        context = multiprocessing.get_context("spawn")
+        self._context = context
+        # Bounded: when workers fall behind, senders wait and then get "busy"
+        self.tasks = context.Queue(maxsize=queue_size)
+        self.results = context.Queue()
+        self.processes = [self._spawn(index) for index in range(workers)]
+        self._connections: Dict[int, Tuple[Connection, threading.Lock]] = {}
+        self._ids = itertools.count()
+        # worker index -> (conn_id, request_id) it is encoding
+        self._in_flight: Dict[int, Tuple[int, int]] = {}
+        self._in_flight_lock = threading.Lock()
+    
+    def _spawn(self, index: int) -> multiprocessing.Process:
+        return self._context.Process(
+            target=_worker_main,
+            args=(index, self.tasks, self.results, settings.EMBEDDING_POOL_TORCH_THREADS),
+            name=f"embedding-worker-{index}",
+            daemon=True
+        )
+    
+    def serve_forever(self):
+        authkey = _authkey()
+        for process in self.processes:
+            process.start()
+        threading.Thread(target=self._route_results, name="embedding-results", daemon=True).start()
+        threading.Thread(target=self._watch_workers, name="embedding-watchdog", daemon=True).start()
+        
+        with Listener(self.address, authkey=authkey) as listener:
+            logger.info("Embedding pool with %d workers listening on %s", len(self.processes), self.address)
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception:
+                    logger.warning("Rejected embedding pool connection", exc_info=True)
+                    continue
+                conn_id = next(self._ids)
+                self._connections[conn_id] = (conn, threading.Lock())
+                threading.Thread(target=self._serve_connection, args=(conn_id, conn), daemon=True).start()
+    
+    def _serve_connection(self, conn_id: int, conn: Connection):
+        try:
+            while True:
+                request_id, texts = conn.recv()
+                try:
+                    self.tasks.put((conn_id, request_id, texts), timeout=settings.EMBEDDING_POOL_QUEUE_TIMEOUT)
+                except queue.Full:
+                    self._send(conn_id, (request_id, "busy", None))
+        except (EOFError, OSError):
+            pass
+        finally:
+            self._connections.pop(conn_id, None)
+            conn.close()
+    
+    def _route_results(self):
+        while True:
+            index, conn_id, request_id, status, payload = self.results.get()
+            with self._in_flight_lock:
+                if status == "started":
+                    self._in_flight[index] = (conn_id, request_id)
+                    continue
+                if self._in_flight.get(index) == (conn_id, request_id):
+                    del self._in_flight[index]
+            self._send(conn_id, (request_id, status, payload))
+    
+    def _watch_workers(self, interval: float = 1.0):
+        """Restart worker processes that died (OOM, crash) and fail what they were encoding"""
+        while True:
+            time.sleep(interval)
+            for index, process in enumerate(self.processes):
+                if process.is_alive():
+                    continue
+                logger.error("Embedding worker %d died (exit code %s); restarting", index, process.exitcode)
+                with self._in_flight_lock:
+                    lost = self._in_flight.pop(index, None)
+                if lost is not None:
+                    conn_id, request_id = lost
+                    self._send(conn_id, (request_id, "error", f"embedding worker {index} died"))
+                self.processes[index] = self._spawn(index)
+                self.processes[index].start()
+    
+    def _send(self, conn_id: int, message):
+        entry = self._connections.get(conn_id)
+        if entry is None:
+            return  # client went away
+        conn, lock = entry
+        try:
+            with lock:
+                conn.send(message)
+        except (EOFError, OSError):
+            self._connections.pop(conn_id, None)
+
+class EmbeddingPoolClient:
+    """Thread-safe client; requests are multiplexed over one connection"""
+    
+    def __init__(self):
+        self._conn: Optional[Connection] = None
+        self._lock = threading.Lock()
+        self._pending: Dict[int, Tuple[Connection, Future]] = {}
+        self._ids = itertools.count()
+    
+    def encode(self, texts: List[str]) -> List[List[float]]:
+        """Blocking encode through the pool"""
+        future = Future()
+        with self._lock:
+            if self._conn is None:
+                self._connect()
+            request_id = next(self._ids)
+            self._pending[request_id] = (self._conn, future)
+            try:
+                self._conn.send((request_id, list(texts)))
+            except (EOFError, OSError):
+                self._pending.pop(request_id, None)
+                self._conn = None
+                raise
+        
+        try:
+            return future.result(timeout=settings.EMBEDDING_POOL_REQUEST_TIMEOUT)
+        except TimeoutError:
+            # A late reply finds no pending entry and is dropped
+            with self._lock:
+                self._pending.pop(request_id, None)
+            raise EmbeddingPoolError(
+                f"No reply from the embedding pool within {settings.EMBEDDING_POOL_REQUEST_TIMEOUT:g}s"
+            )
+    
+    def _connect(self):
+        conn = Client(parse_address(settings.EMBEDDING_POOL_ADDRESS), authkey=_authkey())
+        self._conn = conn
+        threading.Thread(target=self._read, args=(conn,), name="embedding-pool-reader", daemon=True).start()
+    
+    def _read(self, conn: Connection):
+        try:
+            while True:
+                request_id, status, payload = conn.recv()
+                with self._lock:
+                    entry = self._pending.pop(request_id, None)
+                if entry is None:
+                    continue
+                future = entry[1]
+                if status == "ok":
+                    future.set_result(payload)
+                elif status == "busy":
+                    future.set_exception(EmbeddingPoolBusy("Embedding pool queue is full"))
+                else:
+                    future.set_exception(EmbeddingPoolError(payload))
+        except (EOFError, OSError):
+            logger.warning("Lost connection to the embedding pool")
+        finally:
+            # Fail the requests sent on this connection; the next encode reconnects
+            with self._lock:
+                if self._conn is conn:
+                    self._conn = None
+                lost = [request_id for request_id, (sent_on, _) in self._pending.items() if sent_on is conn]
+                futures = [self._pending.pop(request_id)[1] for request_id in lost]
+            for future in futures:
+                future.set_exception(ConnectionError("Embedding pool connection closed"))
+
+# Global instance (API side)
+embedding_pool_client = EmbeddingPoolClient()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    EmbeddingPoolServer(
+        settings.EMBEDDING_POOL_ADDRESS or "127.0.0.1:8765",
+        settings.EMBEDDING_POOL_WORKERS,
+        settings.EMBEDDING_POOL_QUEUE_SIZE
+    ).serve_forever()
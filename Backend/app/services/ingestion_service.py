@@ -0,0 +1,309 @@
+from typing import Dict, List, Optional
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, update, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.base import AsyncSessionLocal
+from app.models.job import IngestionJob
+from app.services.document_service import document_service
+from app.services.text_splitter import ChunkingParams
+from app.services.url_fetcher import url_fetcher
+from app.config import settings
+import asyncio
+import logging
+import os
+import uuid
+
+logger = logging.getLogger(__name__)
+
+SPOOL_EXPIRY_INTERVAL_SECONDS = 3600
+
+class IngestionService:
+    """Runs parse -> chunk -> embed -> store for uploads on a pool of worker tasks"""
+    
+    def __init__(self):
+        self.queue = None
+        self.workers = []
+        self._spool_janitor = None
+        self._prefetched: Dict[int, Future] = {}  # job id -> page fetch started at enqueue time
+    
+    async def start(self):
+        """Start the worker pool and resume jobs left over from a restart"""
+        if self.queue is None:
+            self.queue = asyncio.Queue()
+            self.workers = [
+                asyncio.create_task(self._worker(), name=f"ingestion-{index}")
+                for index in range(settings.INGESTION_WORKERS)
+            ]
+        os.makedirs(settings.INGESTION_SPOOL_DIR, exist_ok=True)
+        if self._spool_janitor is None:
+            self._spool_janitor = asyncio.create_task(self._expire_spool_forever(), name="ingestion-spool-janitor")
+        
+        async with AsyncSessionLocal() as db:
+            for job_id in await self._resumable_job_ids(db):
+                self._submit(job_id)
+    
+    async def shutdown(self):
+        """Stop the workers; unfinished jobs are resumed on next start"""
+        if self._spool_janitor is not None:
+            self._spool_janitor.cancel()
+            self._spool_janitor = None
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+        self.queue = None
+        for future in self._prefetched.values():
+            future.cancel()
+        self._prefetched.clear()
+    
+    def spool_path(self) -> str:
+        """Return a fresh path in the spool directory for an uploaded file"""
+        return os.path.join(settings.INGESTION_SPOOL_DIR, f"{uuid.uuid4().hex}.pdf")
+    
+    def source_available(self, job: IngestionJob) -> bool:
+        """False once a PDF job's spooled upload has expired"""
+        return job.source_type != "pdf" or os.path.exists(job.source)
+    
+    async def expire_spool(self) -> int:
+        """Delete spooled uploads past the retention period that no queued, running
+        or recently failed job needs (failed jobs and orphaned uploads); returns the count"""
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=settings.INGESTION_SPOOL_RETENTION_HOURS)
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(IngestionJob.source).where(
+                    IngestionJob.source_type == "pdf",
+                    or_(
+                        IngestionJob.status.in_(("queued", "running")),
+                        (IngestionJob.status == "failed") & (IngestionJob.finished_at >= cutoff)
+                    )
+                )
+            )
+            needed = {os.path.normpath(source) for source in result.scalars()}
+        
+        def remove_expired() -> int:
+            removed = 0
+            with os.scandir(settings.INGESTION_SPOOL_DIR) as entries:
+                for entry in entries:
+                    if not entry.is_file() or os.path.normpath(entry.path) in needed:
+                        continue
+                    if entry.stat().st_mtime < cutoff.timestamp():
+                        os.unlink(entry.path)
+                        removed += 1
+            return removed
+        
+        return await asyncio.to_thread(remove_expired)
+    
+    async def _expire_spool_forever(self):
+        while True:
+            try:
+                removed = await self.expire_spool()
+                if removed:
+                    logger.info("Deleted %d expired spooled uploads", removed)
+            except Exception:
+                logger.exception("Expiring spooled uploads failed")
+            await asyncio.sleep(SPOOL_EXPIRY_INTERVAL_SECONDS)
+    
+    async def enqueue_pdf(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        file_path: str,
+        filename: str,
+        incremental: bool = False,
+        chunking: Optional[ChunkingParams] = None
+    ) -> IngestionJob:
+        """Queue a spooled PDF for ingestion"""
+        return await self._enqueue(db, user_id, "pdf", file_path, filename, incremental, chunking)
+    
+    async def enqueue_url(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        url: str,
+        incremental: bool = False,
+        chunking: Optional[ChunkingParams] = None
+    ) -> IngestionJob:
+        """Queue a URL for ingestion"""
+        return await self._enqueue(db, user_id, "url", url, url.split("/")[-1] or "webpage", incremental, chunking)
+    
+    async def enqueue_urls(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        urls: List[str],
+        incremental: bool = False,
+        chunking: Optional[ChunkingParams] = None
+    ) -> List[IngestionJob]:
+        """Queue one job per URL and start fetching the pages now, so a batch is
+        downloaded concurrently (per-host limits apply) while jobs wait for a worker"""
+        jobs = []
+        for url in urls:
+            job = await self.enqueue_url(db, user_id, url, incremental, chunking)
+            if self.queue is not None:
+                self._prefetched[job.id] = url_fetcher.submit(url)
+            jobs.append(job)
+        return jobs
+    
+    async def get_job(self, db: AsyncSession, job_id: int, user_id: int) -> Optional[IngestionJob]:
+        """Get a job owned by the user"""
+        result = await db.execute(
+            select(IngestionJob).where(
+                IngestionJob.id == job_id,
+                IngestionJob.user_id == user_id
+            )
+        )
+        return result.scalar_one_or_none()
+    
+    async def get_user_jobs(self, db: AsyncSession, user_id: int, limit: int = 50) -> List[IngestionJob]:
+        """Get the user's most recent jobs"""
+        result = await db.execute(
+            select(IngestionJob)
+            .where(IngestionJob.user_id == user_id)
+            .order_by(IngestionJob.created_at.desc())
+            .limit(limit)
+        )
+        return result.scalars().all()
+    
+    async def retry_job(self, db: AsyncSession, job: IngestionJob) -> IngestionJob:
+        """Re-queue a failed job"""
+        job.status = "queued"
+        job.stage = None
+        job.error = None
+        job.result = None
+        job.progress_current = 0
+        job.progress_total = 0
+        job.finished_at = None
+        await db.commit()
+        await db.refresh(job)
+        
+        self._submit(job.id)
+        return job
+    
+    async def _enqueue(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        source_type: str,
+        source: str,
+        filename: str,
+        incremental: bool,
+        chunking: Optional[ChunkingParams]
+    ) -> IngestionJob:
+        job = IngestionJob(
+            user_id=user_id,
+            source_type=source_type,
+            source=source,
+            filename=filename,
+            incremental=incremental,
+            chunking=chunking._asdict() if chunking else None,
+            status="queued"
+        )
+        db.add(job)
+        await db.commit()
+        await db.refresh(job)
+        
+        self._submit(job.id)
+        return job
+    
+    def _submit(self, job_id: int):
+        if self.queue is None:
+            # Not started (e.g. in a one-off script); the job stays queued
+            # and is picked up on the next start()
+            return
+        self.queue.put_nowait(job_id)
+    
+    def _resumable(self):
+        """Queued jobs, plus running jobs whose worker stopped reporting progress"""
+        stale_before = datetime.now(timezone.utc) - timedelta(seconds=settings.INGESTION_STALE_AFTER_SECONDS)
+        return or_(
+            IngestionJob.status == "queued",
+            (IngestionJob.status == "running") & (IngestionJob.updated_at < stale_before)
+        )
+    
+    async def _resumable_job_ids(self, db: AsyncSession) -> List[int]:
+        result = await db.execute(
+            select(IngestionJob.id).where(self._resumable()).order_by(IngestionJob.id)
+        )
+        return result.scalars().all()
+    
+    async def _claim(self, db: AsyncSession, job_id: int) -> Optional[IngestionJob]:
+        """Atomically move a job to running so only one worker processes it"""
+        result = await db.execute(
+            update(IngestionJob)
+            .where(IngestionJob.id == job_id, self._resumable())
+            .values(status="running", attempts=IngestionJob.attempts + 1)
+        )
+        await db.commit()
+        
+        if not result.rowcount:
+            return None
+        return await db.get(IngestionJob, job_id, populate_existing=True)
+    
+    async def _worker(self):
+        while True:
+            job_id = await self.queue.get()
+            try:
+                await self._run(job_id)
+            except Exception:
+                logger.exception("Ingestion worker crashed on job %s", job_id)
+            finally:
+                self.queue.task_done()
+    
+    async def _run(self, job_id: int):
+        # Popped before claiming so a job run elsewhere does not leave it behind
+        prefetched = self._prefetched.pop(job_id, None)
+        # Job state is tracked in its own session so progress commits never
+        # flush a half-written document from the processing session
+        async with AsyncSessionLocal() as job_db, AsyncSessionLocal() as db:
+            job = await self._claim(job_db, job_id)
+            if job is None:
+                if prefetched is not None:
+                    prefetched.cancel()
+                return
+            
+            async def progress(stage: str, current: int, total: int):
+                job.stage = stage
+                job.progress_current = current
+                job.progress_total = total
+                await job_db.commit()
+            
+            # Jobs queued before chunking was configurable use the defaults
+            chunking = ChunkingParams(**job.chunking) if job.chunking else None
+            try:
+                if job.source_type == "pdf":
+                    result = await document_service.process_pdf(
+                        db, job.user_id, job.source, job.filename,
+                        progress=progress, incremental=job.incremental, chunking=chunking
+                    )
+                else:
+                    html = await asyncio.wrap_future(prefetched) if prefetched is not None else None
+                    result = await document_service.process_url(
+                        db, job.user_id, job.source,
+                        progress=progress, html=html, incremental=job.incremental, chunking=chunking
+                    )
+            except Exception as e:
+                logger.exception("Ingestion job %s failed", job_id)
+                await db.rollback()
+                job.status = "failed"
+                job.error = str(e)
+                job.finished_at = datetime.now(timezone.utc)
+                await job_db.commit()
+                return
+            
+            job.status = "succeeded"
+            job.stage = "done"
+            job.document_id = result.document.id
+            job.result = {
+                "chunks_reused": result.chunks_reused,
+                "chunks_recomputed": result.chunks_recomputed,
+                "chunks_deleted": result.chunks_deleted
+            }
+            job.finished_at = datetime.now(timezone.utc)
+            await job_db.commit()
+            
+            if job.source_type == "pdf" and os.path.exists(job.source):
+                os.unlink(job.source)
+
+# Global instance
+ingestion_service = IngestionService()
@@ -0,0 +1,18 @@
+from typing import Optional
+from langchain_core.language_models import BaseChatModel
+from app.config import settings
+
+class LLMService:
+    """Builds the chat model used to answer questions"""
+    
+    def chat_model(self, api_key: Optional[str] = None) -> BaseChatModel:
+        """Create a chat model for the caller's Groq API key"""
+        from langchain_groq import ChatGroq
+        
+        return ChatGroq(
+            groq_api_key=api_key or settings.GROQ_API_KEY,
+            model_name=settings.LLM_MODEL
+        )
+
+# Global instance
+llm_service = LLMService()
@@ -0,0 +1,57 @@
+from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from app.utils.security import get_password_hash, verify_and_update_password
+from app.config import settings
+import asyncio
+
+class PasswordHasherBusy(RuntimeError):
+    """Too many password hashes queued; the caller should back off and retry"""
+
+class PasswordHasher:
+    """Runs Argon2 hashing on a bounded thread pool so logins don't stall the event loop"""
+    
+    def __init__(self):
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.pending = 0
+        self.rejected = 0
+    
+    def get_executor(self) -> ThreadPoolExecutor:
+        # argon2-cffi releases the GIL while hashing, so threads run in parallel
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                thread_name_prefix="password-hash"
+            )
+        return self._executor
+    
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+    
+    async def verify(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """(matches, new hash if the stored one should be replaced)"""
+        return await self._run(verify_and_update_password, password, hashed_password)
+    
+    def stats(self) -> dict:
+        return {"pending": self.pending, "rejected": self.rejected}
+    
+    def shutdown(self):
+        """Stop the hashing threads, if they were started"""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+    
+    async def _run(self, func, *args):
+        # Every queued hash holds ARGON2_MEMORY_COST once it runs and delays
+        # the ones behind it; past the limit, shed load instead of queueing
+        if self.pending >= settings.PASSWORD_HASH_MAX_PENDING:
+            self.rejected += 1
+            raise PasswordHasherBusy("Password hashing queue is full")
+        
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.get_executor(), func, *args)
+        finally:
+            self.pending -= 1
+
+# Global instance
+password_hasher = PasswordHasher()
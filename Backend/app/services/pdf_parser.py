@@ -0,0 +1,39 @@
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+from langchain_core.documents import Document as PageDocument
+from pypdf import PdfReader
+from app.services.text_splitter import ChunkingParams, split_pages
+
+def open_pdf(pdf_file: BinaryIO) -> PdfReader:
+    """Read a PDF's page tree; page content is read from pdf_file on demand"""
+    # Given a path instead of a file, pypdf would load the whole file into memory
+    reader = PdfReader(pdf_file)
+    len(reader.pages)
+    return reader
+
+def page_ranges(page_count: int, batch_size: int) -> Iterator[Tuple[int, int]]:
+    """[start, end) page ranges covering the whole document"""
+    for start in range(0, page_count, batch_size):
+        yield start, min(start + batch_size, page_count)
+
+def extract_pages(reader: PdfReader, start: int, end: int) -> List[PageDocument]:
+    """Text of pages [start, end), one PageDocument per page like PyPDFLoader"""
+    return [
+        PageDocument(page_content=reader.pages[page].extract_text(), metadata={"page": page})
+        for page in range(start, end)
+    ]
+
+def chunk_pages(reader: PdfReader, start: int, end: int, params: ChunkingParams) -> List[PageDocument]:
+    """Chunks of pages [start, end), each carrying its page number"""
+    return split_pages(extract_pages(reader, start, end), params)
+
+# Parse pool workers keep the reader of the file they are working on
+_worker_reader: Optional[Tuple[str, PdfReader]] = None
+
+def extract_chunks(file_path: str, start: int, end: int, params: ChunkingParams) -> List[PageDocument]:
+    """Process pool entry point: chunks of pages [start, end) of file_path"""
+    global _worker_reader
+    if _worker_reader is None or _worker_reader[0] != file_path:
+        if _worker_reader is not None:
+            _worker_reader[1].stream.close()
+        _worker_reader = (file_path, open_pdf(open(file_path, "rb")))
+    return chunk_pages(_worker_reader[1], start, end, params)
@@ -0,0 +1,143 @@
+from typing import TYPE_CHECKING, Dict, List, Optional
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from app.models.document import DocumentChunk
+from app.services.embedding_cache import embedding_cache
+from app.config import settings
+import asyncio
+import threading
+import time
+
+if TYPE_CHECKING:
+    from sentence_transformers import CrossEncoder
+
+class RerankService:
+    """Re-orders retrieved chunks with a local cross-encoder, within a time budget"""
+    
+    def __init__(self):
+        self.model = None
+        self.warm = False
+        # One inference thread: batches run back to back instead of
+        # competing for CPU cores
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reranker")
+        self._scores = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending = 0  # batches submitted and not yet done
+        self.calls = 0
+        self.timeouts = 0
+        self.skipped = 0
+        self.cache_hits = 0
+        self.pairs_scored = 0
+        self.total_ms = 0.0
+    
+    def get_model(self) -> "CrossEncoder":
+        """Lazy load the cross-encoder"""
+        if self.model is None:
+            from sentence_transformers import CrossEncoder
+            
+            self.model = CrossEncoder(settings.RERANK_MODEL, device="cpu")
+        return self.model
+    
+    async def rerank(self, query: str, chunks: List[DocumentChunk], k: int) -> List[DocumentChunk]:
+        """Return the top k chunks by cross-encoder score, or the first k if the budget runs out"""
+        if not settings.RERANK_ENABLED or len(chunks) <= 1:
+            return chunks[:k]
+        
+        started = time.perf_counter()
+        query_hash = embedding_cache.text_hash(query)
+        scores = self._cached_scores(query_hash, chunks)
+        missing = [chunk for chunk in chunks if chunk.id not in scores]
+        
+        timed_out = skipped = False
+        if missing:
+            future = self._submit(query, query_hash, missing)
+            if future is None:
+                # The thread is already behind; queueing more would only make
+                # every later request wait out its budget too
+                skipped = True
+            else:
+                try:
+                    scores.update(await asyncio.wait_for(
+                        asyncio.wrap_future(future),
+                        timeout=settings.RERANK_TIME_BUDGET_MS / 1000
+                    ))
+                except asyncio.TimeoutError:
+                    # Keep retrieval order. The timeout cancels the batch if it
+                    # has not started; a running one finishes and warms the cache
+                    timed_out = True
+        
+        with self._lock:
+            self.calls += 1
+            self.timeouts += timed_out
+            self.skipped += skipped
+            self.cache_hits += len(chunks) - len(missing)
+            self.total_ms += (time.perf_counter() - started) * 1000
+        
+        if timed_out or skipped:
+            return chunks[:k]
+        return sorted(chunks, key=lambda chunk: scores[chunk.id], reverse=True)[:k]
+    
+    def _submit(self, query: str, query_hash: str, chunks: List[DocumentChunk]) -> Optional[Future]:
+        """Queue a scoring batch, or return None when RERANK_MAX_PENDING are queued or running"""
+        with self._lock:
+            if self._pending >= settings.RERANK_MAX_PENDING:
+                return None
+            self._pending += 1
+        future = self._executor.submit(self._score, query, query_hash, chunks)
+        # Also runs when the batch is cancelled before it starts
+        future.add_done_callback(self._batch_done)
+        return future
+    
+    def _batch_done(self, future: Future):
+        with self._lock:
+            self._pending -= 1
+    
+    async def warm_up(self):
+        """Load the model and run one batch on the reranker thread"""
+        await asyncio.wrap_future(self._executor.submit(self._warm_up))
+    
+    def _warm_up(self):
+        self.get_model().predict([("warm up", "warm up")])
+        self.warm = True
+    
+    def _cached_scores(self, query_hash: str, chunks: List[DocumentChunk]) -> Dict[int, float]:
+        found = {}
+        with self._lock:
+            for chunk in chunks:
+                score = self._scores.get((query_hash, chunk.id))
+                if score is not None:
+                    self._scores.move_to_end((query_hash, chunk.id))
+                    found[chunk.id] = score
+        return found
+    
+    def _score(self, query: str, query_hash: str, chunks: List[DocumentChunk]) -> Dict[int, float]:
+        """Score (query, chunk) pairs in batches; runs on the reranker thread"""
+        model = self.get_model()
+        predictions = model.predict(
+            [(query, chunk.content) for chunk in chunks],
+            batch_size=settings.RERANK_BATCH_SIZE
+        )
+        scores = {chunk.id: float(score) for chunk, score in zip(chunks, predictions)}
+        self.warm = True
+        
+        with self._lock:
+            self.pairs_scored += len(chunks)
+            for chunk_id, score in scores.items():
+                self._scores[(query_hash, chunk_id)] = score
+            while len(self._scores) > settings.RERANK_CACHE_SIZE:
+                self._scores.popitem(last=False)
+        return scores
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "timeouts": self.timeouts,
+                "skipped": self.skipped,
+                "pairs_scored": self.pairs_scored,
+                "cache_hits": self.cache_hits,
+                "avg_ms": round(self.total_ms / self.calls, 2) if self.calls else 0.0
+            }
+
+# Global instance
+rerank_service = RerankService()
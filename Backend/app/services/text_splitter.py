@@ -0,0 +1,56 @@
+from typing import TYPE_CHECKING, List, NamedTuple, Optional
+from functools import lru_cache
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from langchain_core.documents import Document as PageDocument
+from app.config import settings
+
+if TYPE_CHECKING:
+    from transformers import PreTrainedTokenizerFast
+
+class ChunkingParams(NamedTuple):
+    chunk_size: int  # tokens of the embedding model's tokenizer
+    chunk_overlap: int
+
+def resolve_chunking(*layers: Optional[dict]) -> ChunkingParams:
+    """Settings defaults, overridden by each non-empty layer in turn (user, then document)"""
+    values = {"chunk_size": settings.CHUNK_SIZE_TOKENS, "chunk_overlap": settings.CHUNK_OVERLAP_TOKENS}
+    for layer in layers:
+        values.update((key, value) for key, value in (layer or {}).items() if value is not None)
+    
+    params = ChunkingParams(**values)
+    if not 0 < params.chunk_size <= settings.CHUNK_MAX_TOKENS:
+        raise ValueError(f"chunk_size must be between 1 and {settings.CHUNK_MAX_TOKENS} tokens")
+    if not 0 <= params.chunk_overlap < params.chunk_size:
+        raise ValueError("chunk_overlap must be at least 0 and smaller than chunk_size")
+    return params
+
+@lru_cache(maxsize=1)
+def get_tokenizer() -> "PreTrainedTokenizerFast":
+    """The embedding model's tokenizer, loaded once per process"""
+    # Imported here: transformers is slow to import and only ingestion needs it
+    from transformers import AutoTokenizer
+    return AutoTokenizer.from_pretrained(settings.EMBEDDING_MODEL)
+
+def count_tokens(text: str, special_tokens: bool = False) -> int:
+    if len(text) <= 2 and not special_tokens:
+        return _count_short(text)
+    # The Rust tokenizer encodes without mutating state, so threads can share it
+    return len(get_tokenizer().backend_tokenizer.encode(text, add_special_tokens=special_tokens).ids)
+
+@lru_cache(maxsize=65536)
+def _count_short(text: str) -> int:
+    # Text without separators (CJK, long identifiers) is split character by
+    # character, so the same few strings are counted over and over
+    return len(get_tokenizer().backend_tokenizer.encode(text, add_special_tokens=False).ids)
+
+@lru_cache(maxsize=32)
+def get_splitter(params: ChunkingParams) -> RecursiveCharacterTextSplitter:
+    return RecursiveCharacterTextSplitter(
+        chunk_size=params.chunk_size,
+        chunk_overlap=params.chunk_overlap,
+        length_function=count_tokens
+    )
+
+def split_pages(pages: List[PageDocument], params: ChunkingParams) -> List[PageDocument]:
+    """Split pages into chunks of at most params.chunk_size tokens, keeping page metadata"""
+    return get_splitter(params).split_documents(pages)
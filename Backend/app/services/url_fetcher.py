@@ -0,0 +1,145 @@
+from typing import Deque, Dict, Iterable, Iterator, NamedTuple, Optional, Tuple
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from requests.compat import chardet
+from app.config import settings
+import threading
+import requests
+
+class FetchResult(NamedTuple):
+    url: str
+    html: Optional[str]
+    error: Optional[str]
+
+class HostState:
+    """Fetches of one host in flight, and those waiting for one to finish"""
+    
+    def __init__(self):
+        self.active = 0
+        self.waiting: Deque[Tuple[str, Future]] = deque()
+
+class URLFetcher:
+    """Fetches web pages over a shared pooled HTTP session with per-host limits"""
+    
+    def __init__(self):
+        self._session = None
+        self._executor = None
+        # Hosts with fetches in flight or waiting; removed once idle
+        self._hosts: Dict[str, HostState] = {}
+        self._lock = threading.Lock()
+    
+    def get_session(self) -> requests.Session:
+        """Lazy create the shared session; connections are reused across requests"""
+        with self._lock:
+            if self._session is None:
+                adapter = HTTPAdapter(
+                    pool_connections=settings.URL_FETCH_CONCURRENCY,
+                    pool_maxsize=settings.URL_FETCH_PER_HOST_LIMIT
+                )
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers["User-Agent"] = settings.URL_FETCH_USER_AGENT
+                self._session = session
+            return self._session
+    
+    def get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=settings.URL_FETCH_CONCURRENCY,
+                    thread_name_prefix="url-fetch"
+                )
+            return self._executor
+    
+    def submit(self, url: str) -> Future:
+        """Schedule a fetch; the future resolves to the page's HTML.
+        
+        A host already at URL_FETCH_PER_HOST_LIMIT fetches gets the URL queued
+        instead of a blocked executor thread, so a large batch against one
+        host never holds up fetches of other hosts.
+        """
+        future = Future()
+        host = self._host(url)
+        with self._lock:
+            state = self._hosts.setdefault(host, HostState())
+            if state.active >= settings.URL_FETCH_PER_HOST_LIMIT:
+                state.waiting.append((url, future))
+                return future
+            state.active += 1
+        self.get_executor().submit(self._run, host, url, future)
+        return future
+    
+    def fetch(self, url: str) -> str:
+        """Fetch a single page and return its HTML (blocks the calling thread)"""
+        return self.submit(url).result()
+    
+    @staticmethod
+    def _host(url: str) -> str:
+        return urlsplit(url).netloc.lower()
+    
+    def _run(self, host: str, url: str, future: Future):
+        """Executor task: fetch one URL, then hand the host's slot to its next waiting URL"""
+        # Skipped when the caller cancelled the future while it waited
+        if future.set_running_or_notify_cancel():
+            try:
+                future.set_result(self._fetch(url))
+            except Exception as e:
+                future.set_exception(e)
+        
+        with self._lock:
+            state = self._hosts[host]
+            if not state.waiting:
+                state.active -= 1
+                if not state.active:
+                    del self._hosts[host]
+                return
+            next_url, next_future = state.waiting.popleft()
+        # Behind other hosts' queued fetches rather than looping on this thread
+        self.get_executor().submit(self._run, host, next_url, next_future)
+    
+    def _fetch(self, url: str) -> str:
+        session = self.get_session()
+        response = session.get(
+            url,
+            timeout=(settings.URL_FETCH_CONNECT_TIMEOUT, settings.URL_FETCH_READ_TIMEOUT),
+            stream=True
+        )
+        try:
+            response.raise_for_status()
+            
+            body = bytearray()
+            for block in response.iter_content(chunk_size=64 * 1024):
+                body.extend(block)
+                if len(body) > settings.URL_FETCH_MAX_BYTES:
+                    raise ValueError(f"Page exceeds {settings.URL_FETCH_MAX_BYTES} bytes")
+            
+            return self._decode(bytes(body), response.encoding)
+        finally:
+            response.close()
+    
+    @staticmethod
+    def _decode(body: bytes, encoding: Optional[str]) -> str:
+        if encoding is None or encoding.lower() == "iso-8859-1":
+            # Servers often omit the charset; sniff it like WebBaseLoader does
+            try:
+                return body.decode("utf-8")
+            except UnicodeDecodeError:
+                encoding = chardet.detect(body)["encoding"] or "utf-8"
+        return body.decode(encoding, errors="replace")
+    
+    def fetch_many(self, urls: Iterable[str]) -> Iterator[FetchResult]:
+        """Fetch pages concurrently, yielding each result as soon as it finishes"""
+        futures = {self.submit(url): url for url in urls}
+        
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                yield FetchResult(url=url, html=future.result(), error=None)
+            except Exception as e:
+                yield FetchResult(url=url, html=None, error=str(e))
+
+# Global instance
+url_fetcher = URLFetcher()
@@ -1,72 +1,287 @@
-from typing import List
-from sqlalchemy.orm import Session
-from sqlalchemy import text
-from sentence_transformers import SentenceTransformer
-from app.models.document import Document, DocumentChunk
-from app.config import settings
-
-class VectorService:
-    def __init__(self):
-        self.model = None
-    
-    def get_embedding_model(self):
-        """Lazy load embedding model"""
-        if self.model is None:
-            self.model = SentenceTransformer(settings.EMBEDDING_MODEL)
-        return self.model
-    
-    def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings for a list of texts"""
-        model = self.get_embedding_model()
-        embeddings = model.encode(texts, normalize_embeddings=True)
-        return embeddings.tolist()
-    
-    def similarity_search(
-        self, 
-        db: Session, 
-        user_id: int, 
-        query_text: str, 
-        k: int = 4
-    ) -> List[DocumentChunk]:
-        """Search for similar document chunks using cosine similarity"""
-        # Generate query embedding
-        query_embedding = self.generate_embeddings([query_text])[0]
-        
-        # Perform similarity search using pgvector
-        query = text("""
-            SELECT dc.*, d.filename, d.source_type
-            FROM document_chunks dc
-            JOIN documents d ON dc.document_id = d.id
-            WHERE d.user_id = :user_id
-            ORDER BY dc.embedding <=> :query_embedding
-            LIMIT :k
-        """)
-        
-        result = db.execute(
-            query,
-            {
-                "user_id": user_id,
-                "query_embedding": str(query_embedding),
-                "k": k
-            }
-        )
-        
-        chunks = []
-        for row in result:
-            chunk = DocumentChunk(
-                id=row.id,
-                document_id=row.document_id,
-                chunk_index=row.chunk_index,
-                content=row.content,
-                metadata={
-                    "filename": row.filename,
-                    "source_type": row.source_type,
-                    **row.metadata
-                }
-            )
-            chunks.append(chunk)
-        
-        return chunks
-
-# Global instance
+from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text, Integer, Float, String, Text, JSON
+from app.database.base import AsyncSessionLocal
+from app.models.document import Document, DocumentChunk
+from app.services.embedding_backends import load_embedding_model, encode_texts
+from app.services.embedding_pool import embedding_pool_client
+from app.services.embedding_batcher import EmbeddingBatcher
+from app.services.embedding_cache import embedding_cache
+from app.config import settings
+import asyncio
+
+# Result types for raw search queries (asyncpg returns json as text otherwise)
+SEARCH_COLUMNS = {
+    "id": Integer,
+    "document_id": Integer,
+    "chunk_index": Integer,
+    "content": Text,
+    "metadata": JSON,
+    "distance": Float,
+    "score": Float,
+    "filename": String,
+    "source_type": String
+}
+
+# Nearest chunks of one user via the ANN index; candidates are over-fetched
+# and re-ranked by exact distance since iterative scans may return them
+# slightly out of order. Chunks of documents being purged are skipped
+ANN_SEARCH = text("""
+    WITH candidates AS (
+        SELECT id, document_id, chunk_index, content, metadata,
+               embedding <=> :query_embedding AS distance
+        FROM document_chunks
+        WHERE user_id = :user_id
+        ORDER BY embedding <=> :query_embedding
+        LIMIT :candidates
+    )
+    SELECT c.*, d.filename, d.source_type
+    FROM candidates c
+    JOIN documents d ON c.document_id = d.id
+    WHERE d.deleted_at IS NULL
+    ORDER BY c.distance
+    LIMIT :k
+""").columns(**SEARCH_COLUMNS)
+
+# Exact nearest chunks of one user; MATERIALIZED keeps the planner on the
+# (user_id, document_id) index instead of the global ANN index
+EXACT_SEARCH = text("""
+    WITH own_chunks AS MATERIALIZED (
+        SELECT id, document_id, chunk_index, content, metadata, embedding
+        FROM document_chunks
+        WHERE user_id = :user_id
+    )
+    SELECT c.id, c.document_id, c.chunk_index, c.content, c.metadata,
+           c.embedding <=> :query_embedding AS distance,
+           d.filename, d.source_type
+    FROM own_chunks c
+    JOIN documents d ON c.document_id = d.id
+    WHERE d.deleted_at IS NULL
+    ORDER BY distance
+    LIMIT :k
+""").columns(**SEARCH_COLUMNS)
+
+# Full-text match over one user's chunks. Question words are OR-ed so any
+# matching term (identifier, error code, name) makes a chunk a candidate;
+# ts_rank_cd with length normalization ranks them BM25-style. A common term
+# matches most of a large corpus, so at most :max_matches matches (taken
+# from the GIN index in no particular order) are ranked
+LEXICAL_SEARCH = text("""
+    WITH q AS (
+        SELECT replace(plainto_tsquery('english', :query_text)::text, '&', '|')::tsquery AS query
+    ),
+    matches AS (
+        SELECT c.id, c.document_id, c.chunk_index, c.content, c.metadata, c.content_tsv
+        FROM document_chunks c
+        CROSS JOIN q
+        WHERE c.user_id = :user_id AND c.content_tsv @@ q.query
+        LIMIT :max_matches
+    )
+    SELECT m.id, m.document_id, m.chunk_index, m.content, m.metadata,
+           ts_rank_cd(m.content_tsv, q.query, 1) AS score,
+           d.filename, d.source_type
+    FROM matches m
+    CROSS JOIN q
+    JOIN documents d ON m.document_id = d.id
+    WHERE d.deleted_at IS NULL
+    ORDER BY score DESC
+    LIMIT :candidates
+""").columns(**SEARCH_COLUMNS)
+
+class VectorService:
+    def __init__(self):
+        self.model = None
+        self.warm = False
+        self.batcher = EmbeddingBatcher(self._encode)
+        self.parallel_searches = 0  # hybrid searches holding a second connection
+    
+    def get_embedding_model(self):
+        """Lazy load embedding model"""
+        if self.model is None:
+            self.model = load_embedding_model()
+        return self.model
+    
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        """Run the model (or the embedding pool); only called from the batcher thread"""
+        if settings.EMBEDDING_POOL_ADDRESS:
+            embeddings = embedding_pool_client.encode(texts)
+        else:
+            embeddings = encode_texts(self.get_embedding_model(), texts)
+        self.warm = True
+        return embeddings
+    
+    async def warm_up(self):
+        """Load the model and run one batch through the batcher thread"""
+        self.batcher.start()
+        await self.batcher.aencode(["warm up"])
+    
+    async def generate_embeddings(self, texts: List[str], db: Optional[AsyncSession] = None) -> List[List[float]]:
+        """Generate embeddings for a list of texts, encoding only cache misses;
+        the embedding_cache table is only used when a session is given"""
+        hashes = [embedding_cache.text_hash(text) for text in texts]
+        found = await embedding_cache.get_many(db, list(dict.fromkeys(hashes)))
+        
+        missing = {}
+        for text_hash, text in zip(hashes, texts):
+            if text_hash not in found:
+                missing.setdefault(text_hash, text)
+        
+        if missing:
+            computed = await self.batcher.aencode(list(missing.values()))
+            fresh = dict(zip(missing.keys(), computed))
+            await embedding_cache.put_many(fresh, persist=db is not None)
+            found.update(fresh)
+        
+        return [found[text_hash] for text_hash in hashes]
+    
+    async def _tune_index_scan(self, db: AsyncSession, ef_search: Optional[int], probes: Optional[int]):
+        """Apply per-query ANN search parameters for the current transaction only"""
+        ef_search = ef_search or settings.VECTOR_HNSW_EF_SEARCH
+        probes = probes or settings.VECTOR_IVFFLAT_PROBES
+        
+        if ef_search:
+            await db.execute(text("SELECT set_config('hnsw.ef_search', :value, true)"), {"value": str(ef_search)})
+        if probes:
+            await db.execute(text("SELECT set_config('ivfflat.probes', :value, true)"), {"value": str(probes)})
+    
+    async def _enable_iterative_scan(self, db: AsyncSession):
+        mode = settings.VECTOR_ITERATIVE_SCAN
+        if not mode or settings.VECTOR_INDEX_TYPE == "none":
+            return
+        # Iterative scans need pgvector 0.8+; on older versions the setting
+        # does not exist and the exact-scan fallback covers filtered queries
+        await db.execute(
+            text("SELECT set_config(:name, :mode, true) WHERE current_setting(:name, true) IS NOT NULL"),
+            {"name": f"{settings.VECTOR_INDEX_TYPE}.iterative_scan", "mode": mode}
+        )
+    
+    async def similarity_search(
+        self, 
+        db: AsyncSession, 
+        user_id: int, 
+        query_text: str, 
+        k: int = 4,
+        query_embedding: Optional[List[float]] = None,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None
+    ) -> List[DocumentChunk]:
+        """Search for similar document chunks using cosine similarity"""
+        # Generate query embedding
+        if query_embedding is None:
+            query_embedding = (await self.generate_embeddings([query_text], db))[0]
+        
+        await self._tune_index_scan(db, ef_search, probes)
+        
+        params = {
+            "user_id": user_id,
+            "query_embedding": str(query_embedding),
+            "k": k,
+            "candidates": k * max(settings.VECTOR_SEARCH_OVERFETCH, 1)
+        }
+        
+        # ANN search restricted to the tenant's chunks; iterative scan keeps
+        # walking the index until enough of this user's rows are found
+        await self._enable_iterative_scan(db)
+        rows = (await db.execute(ANN_SEARCH, params)).all()
+        
+        if len(rows) < k:
+            # The index scan gave up early (or the user has fewer than k
+            # chunks): fall back to an exact scan over this user's chunks only
+            rows = (await db.execute(EXACT_SEARCH, params)).all()
+        
+        return [self._to_chunk(row) for row in rows]
+    
+    async def lexical_search(self, db: AsyncSession, user_id: int, query_text: str, k: int = 4) -> List[DocumentChunk]:
+        """Search the user's chunks with the full-text index"""
+        rows = (await db.execute(LEXICAL_SEARCH, {
+            "user_id": user_id,
+            "query_text": query_text,
+            "candidates": k,
+            "max_matches": max(settings.SEARCH_LEXICAL_MAX_MATCHES, k)
+        })).all()
+        return [self._to_chunk(row) for row in rows]
+    
+    async def hybrid_search(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        query_text: str,
+        k: int = 4,
+        query_embedding: Optional[List[float]] = None,
+        vector_weight: Optional[float] = None,
+        lexical_weight: Optional[float] = None,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None
+    ) -> List[DocumentChunk]:
+        """Dense + full-text search merged with reciprocal-rank fusion"""
+        vector_weight = settings.SEARCH_VECTOR_WEIGHT if vector_weight is None else vector_weight
+        lexical_weight = settings.SEARCH_LEXICAL_WEIGHT if lexical_weight is None else lexical_weight
+        
+        if not lexical_weight:
+            return await self.similarity_search(
+                db, user_id, query_text, k=k, query_embedding=query_embedding,
+                ef_search=ef_search, probes=probes
+            )
+        
+        if query_embedding is None and vector_weight:
+            query_embedding = (await self.generate_embeddings([query_text], db))[0]
+        
+        candidates = max(settings.SEARCH_HYBRID_CANDIDATES, k)
+        
+        async def dense():
+            if not vector_weight:
+                return []
+            return await self.similarity_search(
+                db, user_id, query_text, k=candidates, query_embedding=query_embedding,
+                ef_search=ef_search, probes=probes
+            )
+        
+        async def lexical():
+            async with AsyncSessionLocal() as search_db:
+                return await self.lexical_search(search_db, user_id, query_text, k=candidates)
+        
+        if vector_weight and self.parallel_searches < settings.SEARCH_PARALLEL_SESSIONS:
+            # Overlap the two queries: the full-text one gets a short-lived
+            # connection from the overflow reserved for it in the pool. Past
+            # that limit both run on the caller's connection instead of
+            # waiting for a free one
+            self.parallel_searches += 1
+            try:
+                dense_chunks, lexical_chunks = await asyncio.gather(dense(), lexical())
+            finally:
+                self.parallel_searches -= 1
+        else:
+            dense_chunks = await dense()
+            lexical_chunks = await self.lexical_search(db, user_id, query_text, k=candidates)
+        
+        return self._fuse([(dense_chunks, vector_weight), (lexical_chunks, lexical_weight)], k)
+    
+    @staticmethod
+    def _fuse(ranked_lists, k: int) -> List[DocumentChunk]:
+        """Reciprocal-rank fusion of (chunks, weight) lists"""
+        scores = {}
+        chunks = {}
+        for ranked, weight in ranked_lists:
+            for rank, chunk in enumerate(ranked, start=1):
+                scores[chunk.id] = scores.get(chunk.id, 0.0) + weight / (settings.SEARCH_RRF_K + rank)
+                chunks.setdefault(chunk.id, chunk)
+        
+        best = sorted(scores, key=scores.get, reverse=True)[:k]
+        return [chunks[chunk_id] for chunk_id in best]
+    
+    @staticmethod
+    def _to_chunk(row) -> DocumentChunk:
+        return DocumentChunk(
+            id=row.id,
+            document_id=row.document_id,
+            chunk_index=row.chunk_index,
+            content=row.content,
+            metadata={
+                "filename": row.filename,
+                "source_type": row.source_type,
+                **row.metadata
+            }
+        )
+
+# Global instance
 vector_service = VectorService()
\ No newline at end of file
@@ -1,39 +1,53 @@
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app.database.base import get_db
-from app.models.user import User
-from app.utils.security import decode_access_token
-
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
-
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user"""
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
-    payload = decode_access_token(token)
-    if payload is None:
-        raise credentials_exception
-    
-    user_id: int = payload.get("user_id")
-    if user_id is None:
-        raise credentials_exception
-    
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
-        raise credentials_exception
-    
-    if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Inactive user"
-        )
-    
-    return user
\ No newline at end of file
+from typing import Callable, Optional
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+from app.database.base import AsyncSessionLocal
+from app.models.user import User
+from app.schemas.auth import Principal
+from app.services.auth_cache import auth_cache
+from app.services.llm_service import llm_service
+from app.utils.security import decode_access_token
+from langchain_core.language_models import BaseChatModel
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> Principal:
+    """Get current authenticated user, from the auth cache when possible"""
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    
+    payload = auth_cache.get_token(token)
+    if payload is None:
+        payload = decode_access_token(token)
+        if payload is None:
+            raise credentials_exception
+        auth_cache.put_token(token, payload)
+    
+    user_id: int = payload.get("user_id")
+    if user_id is None:
+        raise credentials_exception
+    
+    user = await auth_cache.get_user(user_id)
+    if user is None:
+        # Own short-lived session: requests that only need the user never hold a connection
+        async with AsyncSessionLocal() as db:
+            row = await db.get(User, user_id)
+        if row is None:
+            raise credentials_exception
+        user = Principal.model_validate(row)
+        await auth_cache.put_user(user)
+    
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Inactive user"
+        )
+    
+    return user
+
+def get_chat_model_factory() -> Callable[[Optional[str]], BaseChatModel]:
+    """Get the chat model factory (override with a fake streaming model in tests)"""
+    return llm_service.chat_model
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""Recall vs. latency of the ANN index against exact search on document_chunks.
+
+Usage (from Backend/, against a database with ingested chunks):
+    python -m benchmarks.bench_ann_recall --queries 100 --k 4
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import numpy as np
+from sqlalchemy import text
+from pgvector.sqlalchemy import Vector
+from app.database.base import AsyncSessionLocal, engine
+from app.database.indexes import vector_index_status
+
+SEARCH = text("""
+    SELECT id FROM document_chunks
+    ORDER BY embedding <=> :query_embedding
+    LIMIT :k
+""")
+
+async def sample_queries(db, count: int, noise: float):
+    """Perturbed copies of random stored embeddings, re-normalized"""
+    rows = (await db.execute(text(
+        "SELECT embedding FROM document_chunks ORDER BY random() LIMIT :n"
+    ).columns(embedding=Vector), {"n": count})).all()
+    rng = np.random.default_rng(0)
+    queries = []
+    for (embedding,) in rows:
+        vector = np.asarray(embedding, dtype=np.float32)
+        vector = vector + rng.normal(0, noise, vector.shape).astype(np.float32)
+        queries.append(str((vector / np.linalg.norm(vector)).tolist()))
+    return queries
+
+async def search(db, query: str, k: int, settings_sql: list):
+    """Run one search in its own transaction so SET LOCAL does not leak"""
+    for statement in settings_sql:
+        await db.execute(text(statement))
+    start = time.perf_counter()
+    ids = [row.id for row in await db.execute(SEARCH, {"query_embedding": query, "k": k})]
+    elapsed = time.perf_counter() - start
+    await db.rollback()
+    return ids, elapsed * 1000
+
+def report(label: str, latencies: list, recalls: list):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) >= 20 else latencies[-1]
+    print(f"{label:<18} recall@k {statistics.mean(recalls):6.3f}   "
+          f"p50 {statistics.median(latencies):7.2f} ms   p95 {p95:7.2f} ms")
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--noise", type=float, default=0.02)
+    args = parser.parse_args()
+    
+    status = await vector_index_status()
+    print(f"Index: {status['definition'] if status else 'none'}")
+    index_type = "ivfflat" if status and "ivfflat" in status["definition"] else "hnsw"
+    
+    db = AsyncSessionLocal()
+    try:
+        queries = await sample_queries(db, args.queries, args.noise)
+        
+        exact = []
+        latencies = []
+        for query in queries:
+            ids, elapsed = await search(db, query, args.k, [
+                "SET LOCAL enable_indexscan = off",
+                "SET LOCAL enable_bitmapscan = off"
+            ])
+            exact.append(set(ids))
+            latencies.append(elapsed)
+        report("exact", latencies, [1.0] * len(queries))
+        
+        if index_type == "hnsw":
+            sweep = [("hnsw.ef_search", value) for value in (10, 20, 40, 80, 160, 320)]
+        else:
+            sweep = [("ivfflat.probes", value) for value in (1, 2, 4, 8, 16, 32)]
+        
+        for name, value in sweep:
+            latencies = []
+            recalls = []
+            for query, expected in zip(queries, exact):
+                ids, elapsed = await search(db, query, args.k, [f"SET LOCAL {name} = {value}"])
+                latencies.append(elapsed)
+                recalls.append(len(expected & set(ids)) / max(len(expected), 1))
+            report(f"{name}={value}", latencies, recalls)
+    finally:
+        await db.close()
+        await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,188 @@
+"""Bytes on the wire and latency of the document endpoints' queries, with chunk
+embeddings deferred versus loaded with every chunk row as before.
+
+Queries go through a local TCP proxy that counts the bytes Postgres sends
+back. Every call runs in a transaction that is rolled back afterwards, so
+deletes leave the data in place for the next repeat.
+
+Usage (from Backend/, against a scratch database):
+    python -m benchmarks.bench_chunk_loading --documents 20 --chunks 200
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+from contextlib import asynccontextmanager
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
+from sqlalchemy.orm import selectinload, undefer
+from app.config import settings
+from app.database.base import AsyncSessionLocal, async_database_url, init_db
+from app.models.user import User
+from app.models.document import Document, DocumentChunk
+from app.models.chat import ChatSession  # noqa: F401 (User relationship target)
+from app.services.chunk_writer import chunk_writer
+from app.services.document_service import document_service
+
+# Chunk loading as the endpoints did it before: whole rows, vectors included
+FULL_CHUNKS = selectinload(Document.chunks).options(
+    undefer(DocumentChunk.embedding), undefer(DocumentChunk.content_tsv)
+)
+
+class CountingProxy:
+    """Forwards TCP connections to Postgres and counts bytes sent back"""
+    
+    def __init__(self, database_url: str):
+        url = make_url(database_url)
+        socket_dir = url.query.get("host")
+        if url.host is None and socket_dir:
+            self.upstream = lambda: asyncio.open_unix_connection(f"{socket_dir}/.s.PGSQL.{url.port or 5432}")
+        else:
+            self.upstream = lambda: asyncio.open_connection(url.host or "localhost", url.port or 5432)
+        self.url = url.difference_update_query(["host"]).set(host="127.0.0.1")
+        self.received = 0
+    
+    async def start(self):
+        server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.url = self.url.set(port=server.sockets[0].getsockname()[1])
+        return server
+    
+    async def _handle(self, client_reader, client_writer):
+        server_reader, server_writer = await self.upstream()
+        await asyncio.gather(
+            self._pipe(client_reader, server_writer, count=False),
+            self._pipe(server_reader, client_writer, count=True)
+        )
+    
+    async def _pipe(self, reader, writer, count: bool):
+        try:
+            while data := await reader.read(65536):
+                if count:
+                    self.received += len(data)
+                writer.write(data)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+async def list_before(db: AsyncSession, user_id: int):
+    result = await db.execute(select(Document).options(FULL_CHUNKS).where(Document.user_id == user_id))
+    return [(doc.id, len(doc.chunks)) for doc in result.scalars()]
+
+async def list_now(db: AsyncSession, user_id: int):
+    return [(doc.id, doc.chunk_count) for doc in await document_service.get_user_documents(db, user_id, 50)]
+
+async def upload_response_before(db: AsyncSession, document_id: int):
+    # db.refresh(document) followed by len(document.chunks)
+    document = await db.get(Document, document_id, options=[FULL_CHUNKS], populate_existing=True)
+    return len(document.chunks)
+
+async def upload_response_now(db: AsyncSession, document_id: int):
+    document = await db.get(Document, document_id, populate_existing=True)
+    return document.chunk_count
+
+async def delete_before(db: AsyncSession, document_id: int, user_id: int):
+    document = await db.get(Document, document_id, options=[FULL_CHUNKS])
+    await db.delete(document)
+    await db.commit()
+
+async def delete_now(db: AsyncSession, document_id: int, user_id: int):
+    await document_service.delete_document(db, document_id, user_id)
+
+@asynccontextmanager
+async def rolled_back_session(engine: AsyncEngine):
+    """Session whose commits only release savepoints of an outer transaction"""
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        db = AsyncSession(bind=conn, join_transaction_mode="create_savepoint", expire_on_commit=False)
+        try:
+            yield db
+        finally:
+            await db.close()
+            await transaction.rollback()
+
+async def measure(proxy: CountingProxy, engine: AsyncEngine, repeats: int, operation, *args):
+    """Median latency in ms and bytes received per call"""
+    timings, received = [], []
+    for _ in range(repeats):
+        async with rolled_back_session(engine) as db:
+            before = proxy.received
+            start = time.perf_counter()
+            await operation(db, *args)
+            timings.append((time.perf_counter() - start) * 1000)
+            received.append(proxy.received - before)
+    return statistics.median(timings), statistics.median(received)
+
+async def seed(documents: int, chunks: int) -> tuple:
+    async with AsyncSessionLocal() as db:
+        user = User(
+            email=f"bench-{uuid.uuid4().hex}@example.com",
+            username=f"bench-{uuid.uuid4().hex[:8]}",
+            hashed_password="-"
+        )
+        db.add(user)
+        await db.flush()
+        document_ids = []
+        for index in range(documents):
+            document = Document(user_id=user.id, filename=f"bench-{index}.pdf", source_type="pdf", chunk_count=chunks)
+            db.add(document)
+            await db.flush()
+            document_ids.append(document.id)
+            await chunk_writer.write(db, (
+                {
+                    "document_id": document.id,
+                    "user_id": user.id,
+                    "chunk_index": idx,
+                    "content": f"chunk {idx} " + "lorem ipsum dolor sit amet " * 35,
+                    "embedding": [random.random() for _ in range(settings.EMBEDDING_DIMENSION)],
+                    "metadata": {"page": idx // 3}
+                }
+                for idx in range(chunks)
+            ))
+        await db.commit()
+        return user.id, document_ids
+
+async def cleanup(user_id: int, document_ids: list):
+    async with AsyncSessionLocal() as db:
+        for document_id in document_ids:
+            await document_service.delete_document(db, document_id, user_id)
+        await db.delete(await db.get(User, user_id))
+        await db.commit()
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=20)
+    parser.add_argument("--chunks", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    
+    await init_db()
+    user_id, document_ids = await seed(args.documents, args.chunks)
+    
+    proxy = CountingProxy(settings.DATABASE_URL)
+    server = await proxy.start()
+    engine = create_async_engine(async_database_url(proxy.url.render_as_string(hide_password=False)), pool_size=1)
+    print(f"{args.documents} documents x {args.chunks} chunks, {settings.EMBEDDING_DIMENSION}-dim embeddings")
+    
+    try:
+        cases = [
+            ("document list", (list_before, list_now), (user_id,)),
+            ("upload response", (upload_response_before, upload_response_now), (document_ids[0],)),
+            ("delete", (delete_before, delete_now), (document_ids[0], user_id)),
+        ]
+        for name, operations, operation_args in cases:
+            results = [await measure(proxy, engine, args.repeats, operation, *operation_args) for operation in operations]
+            (before_ms, before_bytes), (now_ms, now_bytes) = results
+            print(f"{name:<16} before {before_bytes / 1024:9.1f} KiB {before_ms:8.1f} ms   "
+                  f"now {now_bytes / 1024:9.1f} KiB {now_ms:8.1f} ms")
+    finally:
+        await engine.dispose()
+        server.close()
+        await cleanup(user_id, document_ids)
+
+if __name__ == "__main__":
+    asyncio.run(main())
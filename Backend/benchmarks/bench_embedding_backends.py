@@ -0,0 +1,84 @@
+"""Parity and throughput of the embedding backends (torch, onnx, onnx-int8) on CPU.
+
+Parity is the cosine similarity of each backend's embeddings to the PyTorch
+reference; the script exits non-zero if any backend falls below --min-cosine.
+
+Usage (from Backend/):
+    python -m benchmarks.bench_embedding_backends --backends torch onnx onnx-int8 --batch-sizes 1 8 32 64
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+import numpy as np
+from app.services.embedding_backends import BACKENDS, load_embedding_model
+
+WORDS = (
+    "invoice payment error code timeout database index vector search query "
+    "document upload page chapter summary customer account password network "
+    "latency throughput server request response model embedding token"
+).split()
+
+def sample_texts(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(WORDS, k=rng.randint(8, 120))) for _ in range(count)]
+
+def encode(model, texts, batch_size: int) -> np.ndarray:
+    return model.encode(texts, batch_size=batch_size, normalize_embeddings=True, convert_to_numpy=True)
+
+def parity(reference: np.ndarray, candidate: np.ndarray):
+    # Both sides are normalized, so the row-wise dot product is the cosine
+    cosines = np.sum(reference * candidate, axis=1)
+    return float(cosines.mean()), float(cosines.min())
+
+def throughput(model, texts, batch_size: int, rounds: int):
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    encode(model, batches[0], batch_size)  # warm-up
+    
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for batch in batches:
+            batch_start = time.perf_counter()
+            encode(model, batch, batch_size)
+            latencies.append((time.perf_counter() - batch_start) * 1000)
+    elapsed = time.perf_counter() - start
+    
+    latencies.sort()
+    p99 = latencies[max(int(len(latencies) * 0.99) - 1, 0)]
+    return len(texts) * rounds / elapsed, statistics.median(latencies), p99
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 8, 32, 64])
+    parser.add_argument("--texts", type=int, default=256)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--min-cosine", type=float, default=0.99)
+    args = parser.parse_args()
+    
+    texts = sample_texts(args.texts)
+    reference = encode(load_embedding_model("torch"), texts, 32)
+    
+    failed = False
+    for backend in args.backends:
+        start = time.perf_counter()
+        model = load_embedding_model(backend)
+        load_s = time.perf_counter() - start
+        
+        mean_cos, min_cos = parity(reference, encode(model, texts, 32))
+        ok = min_cos >= args.min_cosine
+        failed |= not ok
+        print(f"{backend:<10} load {load_s:6.2f}s   cosine vs torch mean {mean_cos:.5f} "
+              f"min {min_cos:.5f}   {'ok' if ok else 'FAIL'}")
+        
+        for batch_size in args.batch_sizes:
+            rate, p50, p99 = throughput(model, texts, batch_size, args.rounds)
+            print(f"{'':<10} batch {batch_size:>4}   {rate:9.1f} texts/s   "
+                  f"p50 {p50:8.2f} ms   p99 {p99:8.2f} ms")
+    
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
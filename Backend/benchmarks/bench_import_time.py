@@ -0,0 +1,51 @@
+"""Import-time cost of app.main, measured with `python -X importtime` in a fresh interpreter.
+
+Usage (from Backend/):
+    python -m benchmarks.bench_import_time --top 20
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+def measure(module: str):
+    """Return [(cumulative_us, self_us, depth, name)] for one cold import"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        sys.exit(result.stderr)
+    
+    entries = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((int(cumulative_us), int(self_us), len(indent) // 2, name))
+    return entries
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    
+    totals = []
+    for _ in range(args.runs):
+        entries = measure(args.module)
+        totals.append(next(cumulative for cumulative, _, _, name in entries if name == args.module))
+    print(f"import {args.module}: best {min(totals) / 1000:.0f} ms over {args.runs} runs")
+    
+    print("\nslowest imports (cumulative, last run):")
+    for cumulative, self_us, depth, name in sorted(entries, reverse=True)[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {self_us / 1000:7.1f} ms self  {'  ' * depth}{name}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Login burst: Argon2 verification inline on the event loop versus on the
+password hashing pool, and what each does to everything else on the loop.
+
+A probe task sleeps PROBE_MS at a time and records how late it wakes up; that
+lateness is what a chat request or a health check would wait during the burst.
+Only password verification is timed, the database stays out of the numbers.
+
+Usage (from Backend/):
+    python -m benchmarks.bench_login_burst --logins 64 --workers 1 2 4
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from passlib.hash import argon2
+from app.config import settings
+from app.utils.security import get_password_hash, pwd_context, verify_password
+from app.services.password_hasher import PasswordHasher
+
+PROBE_MS = 5.0
+
+async def probe(lags: list, stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_MS / 1000)
+        lags.append((time.perf_counter() - start) * 1000 - PROBE_MS)
+
+async def inline_login(password: str, hashed: str):
+    # The old handler: async def, but the hash runs on the loop
+    return verify_password(password, hashed)
+
+async def burst(login, logins: int):
+    """Return (seconds, probe lag samples in ms)"""
+    lags, stop = [], asyncio.Event()
+    prober = asyncio.create_task(probe(lags, stop))
+    await asyncio.sleep(0.05)
+    
+    start = time.perf_counter()
+    results = await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    
+    stop.set()
+    await prober
+    assert all(results)
+    return elapsed, lags
+
+def report(name: str, logins: int, elapsed: float, lags: list):
+    lags = sorted(lags)
+    p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))]
+    print(f"{name:<14} {logins / elapsed:7.1f} logins/s   loop lag p50 {statistics.median(lags):7.1f} ms   "
+          f"p99 {p99:7.1f} ms   max {lags[-1]:7.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4])
+    args = parser.parse_args()
+    
+    password = "correct horse battery staple"
+    hashed = get_password_hash(password)
+    print(f"Argon2 t={settings.ARGON2_TIME_COST} m={settings.ARGON2_MEMORY_COST} KiB "
+          f"p={settings.ARGON2_PARALLELISM}, {args.logins} concurrent logins")
+    
+    elapsed, lags = asyncio.run(burst(lambda: inline_login(password, hashed), args.logins))
+    report("inline", args.logins, elapsed, lags)
+    
+    settings.PASSWORD_HASH_MAX_PENDING = args.logins
+    for workers in args.workers:
+        settings.PASSWORD_HASH_WORKERS = workers
+        hasher = PasswordHasher()
+        
+        async def pooled_login():
+            matches, _ = await hasher.verify(password, hashed)
+            return matches
+        
+        try:
+            elapsed, lags = asyncio.run(burst(pooled_login, args.logins))
+        finally:
+            hasher.shutdown()
+        report(f"pool, {workers} threads", args.logins, elapsed, lags)
+    
+    # A hash made with weaker parameters is replaced on the next login
+    old = argon2.using(rounds=1, memory_cost=8192, parallelism=1).hash(password)
+    matches, new_hash = pwd_context.verify_and_update(password, old)
+    print(f"rehash on login: {'yes' if matches and new_hash else 'NO'} ({old.split('$')[3]} -> "
+          f"{new_hash.split('$')[3] if new_hash else '-'})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Peak memory of PDF ingestion: eager (load every page, then split and embed)
+versus streaming page batches, on a synthetic PDF.
+
+Each mode runs in a fresh interpreter and reports its peak RSS. Embeddings are
+random 384-dim vectors so the model and the database stay out of the numbers;
+the eager mode keeps them all, as the old pipeline did before inserting.
+
+Usage (from Backend/):
+    python -m benchmarks.bench_pdf_memory --pages 1000 --batch-size 16
+"""
+import argparse
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+WORDS = (
+    "invoice payment error code timeout database index vector search query "
+    "document upload page chapter summary customer account password network "
+    "latency throughput server request response model embedding token"
+).split()
+
+def write_pdf(path: str, pages: int, lines_per_page: int = 50, seed: int = 0):
+    """Minimal uncompressed PDF with lines of Helvetica text on every page"""
+    rng = random.Random(seed)
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for _ in range(pages):
+        page_id = len(objects) + 1
+        kids.append(f"{page_id} 0 R")
+        lines = " ".join(f"({' '.join(rng.choices(WORDS, k=12))}) '" for _ in range(lines_per_page))
+        stream = f"BT /F1 9 Tf 36 806 Td 11 TL {lines} ET".encode()
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>".encode()
+    
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+        xref = f.tell()
+        f.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+        for offset in offsets:
+            f.write(f"{offset:010d} 00000 n \n".encode())
+        f.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+
+def fake_embeddings(count: int):
+    return [[random.random() for _ in range(384)] for _ in range(count)]
+
+def run_eager(path: str, batch_size: int) -> int:
+    from langchain_community.document_loaders import PyPDFLoader
+    from app.services.text_splitter import resolve_chunking, split_pages
+    
+    pages = PyPDFLoader(path).load()
+    chunks = split_pages(pages, resolve_chunking())
+    embeddings = fake_embeddings(len(chunks))
+    return len(embeddings)
+
+def run_streaming(path: str, batch_size: int) -> int:
+    from app.services import pdf_parser
+    from app.services.text_splitter import resolve_chunking, split_pages
+    
+    written = 0
+    with open(path, "rb") as pdf_file:
+        reader = pdf_parser.open_pdf(pdf_file)
+        for start, end in pdf_parser.page_ranges(len(reader.pages), batch_size):
+            pages = pdf_parser.extract_pages(reader, start, end)
+            chunks = split_pages(pages, resolve_chunking())
+            embeddings = fake_embeddings(len(chunks))
+            written += len(embeddings)
+    return written
+
+MODES = {"eager": run_eager, "streaming": run_streaming}
+
+def child(mode: str, path: str, batch_size: int):
+    # Import everything and load the tokenizer up front so the baseline covers them
+    from langchain_community.document_loaders import PyPDFLoader  # noqa: F401
+    from app.services import pdf_parser, text_splitter  # noqa: F401
+    text_splitter.get_tokenizer()
+    
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    chunks = MODES[mode](path, batch_size)
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KiB on Linux
+    print(f"{chunks} {elapsed:.3f} {baseline_kb} {peak_kb}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PDF"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        child(args.child[0], args.child[1], args.batch_size)
+        return
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "synthetic.pdf")
+        write_pdf(path, args.pages)
+        print(f"synthetic PDF: {args.pages} pages, {os.path.getsize(path) / 2**20:.1f} MiB")
+        
+        for mode in MODES:
+            result = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_pdf_memory",
+                 "--batch-size", str(args.batch_size), "--child", mode, path],
+                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                capture_output=True,
+                text=True
+            )
+            if result.returncode != 0:
+                sys.exit(result.stderr)
+            chunks, elapsed, baseline_kb, peak_kb = result.stdout.split()
+            print(f"{mode:<10} {int(chunks):>6} chunks   {float(elapsed):7.2f} s   "
+                  f"peak RSS {int(peak_kb) / 1024:7.1f} MiB "
+                  f"(+{(int(peak_kb) - int(baseline_kb)) / 1024:.1f} MiB over imports)")
+
+if __name__ == "__main__":
+    main()
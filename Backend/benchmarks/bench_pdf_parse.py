@@ -0,0 +1,77 @@
+"""PDF text extraction and splitting speed: in-thread versus the process pool
+(PDF_PARSE_WORKERS), on a synthetic PDF.
+
+Runs DocumentService's page batch pipeline without embedding or storing, and
+checks every parallel run returns the same chunks, in the same order, as the
+sequential one.
+
+Usage (from Backend/):
+    python -m benchmarks.bench_pdf_parse --pages 1000 --workers 2 4 8
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from app.config import settings
+from app.services import pdf_parser
+from app.services.text_splitter import resolve_chunking
+from app.services.document_service import DocumentService
+from benchmarks.bench_pdf_memory import write_pdf
+
+async def parse(path: str, workers: int):
+    """Return (chunks, seconds, seconds to the first batch)"""
+    settings.PDF_PARSE_WORKERS = workers
+    service = DocumentService()
+    if workers > 1:
+        # Start the processes up front; a long-running server pays this once
+        list(service.get_parse_executor().map(time.sleep, [0.5] * workers))
+    
+    try:
+        start = time.perf_counter()
+        with open(path, "rb") as pdf_file:
+            reader = await asyncio.to_thread(pdf_parser.open_pdf, pdf_file)
+            chunks, first_batch = [], None
+            async for _, batch in service._chunk_batches(path, reader, len(reader.pages), resolve_chunking()):
+                if first_batch is None:
+                    first_batch = time.perf_counter() - start
+                chunks.extend(batch)
+        return chunks, time.perf_counter() - start, first_batch
+    finally:
+        service.shutdown()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--workers", nargs="+", type=int, default=[2, 4, 8])
+    parser.add_argument("--batch-size", type=int, default=settings.INGESTION_PAGE_BATCH_SIZE)
+    args = parser.parse_args()
+    settings.INGESTION_PAGE_BATCH_SIZE = args.batch_size
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "synthetic.pdf")
+        write_pdf(path, args.pages)
+        print(f"synthetic PDF: {args.pages} pages, batches of {args.batch_size}, {os.cpu_count()} CPUs")
+        
+        reference, baseline, first = asyncio.run(parse(path, 0))
+        print(f"thread        {baseline:7.2f} s   first batch {first * 1000:7.1f} ms   "
+              f"{args.pages / baseline:7.1f} pages/s")
+        
+        failed = False
+        for workers in args.workers:
+            chunks, elapsed, first = asyncio.run(parse(path, workers))
+            same = [
+                (chunk.metadata["page"], chunk.page_content) for chunk in chunks
+            ] == [
+                (chunk.metadata["page"], chunk.page_content) for chunk in reference
+            ]
+            failed |= not same
+            print(f"{workers:>2} processes  {elapsed:7.2f} s   first batch {first * 1000:7.1f} ms   "
+                  f"{args.pages / elapsed:7.1f} pages/s   x{baseline / elapsed:.2f}   "
+                  f"{'same chunks' if same else 'CHUNKS DIFFER'}")
+    
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Token-aware splitter versus the old 1000/200 character splitter: chunks/s and
+how many chunks the embedding model would truncate.
+
+Pages mix prose, identifier-heavy tables and CJK text; the last two pack far
+more tokens into 1000 characters than English prose does. A chunk is truncated
+when it has more tokens, [CLS] and [SEP] included, than the model accepts.
+
+Usage (from Backend/):
+    python -m benchmarks.bench_text_splitter --pages 500 --workers 1 2 4
+"""
+import argparse
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from langchain_core.documents import Document as PageDocument
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from app.services.text_splitter import count_tokens, get_tokenizer, resolve_chunking, split_pages
+
+WORDS = (
+    "invoice payment error code timeout database index vector search query "
+    "document upload page chapter summary customer account password network "
+    "latency throughput server request response model embedding token"
+).split()
+CJK = "設定パスワード変更手順確認データ検索文書送信応答"
+
+def sample_pages(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    pages = []
+    for page in range(count):
+        kind = page % 3
+        if kind == 0:
+            text = "\n\n".join(
+                " ".join(rng.choices(WORDS, k=rng.randint(40, 120))) + "." for _ in range(6)
+            )
+        elif kind == 1:
+            text = "\n".join(
+                f"{rng.randrange(16 ** 8):08x}-{rng.randrange(16 ** 4):04x} {rng.random():.6f} "
+                f"SKU{rng.randrange(10 ** 6):06d} E{rng.randrange(9999):04d}"
+                for _ in range(60)
+            )
+        else:
+            text = "".join(rng.choices(CJK, k=2500))
+        pages.append(PageDocument(page_content=text, metadata={"page": page}))
+    return pages
+
+def report(name: str, chunks, elapsed: float, max_tokens: int):
+    tokens = [count_tokens(chunk.page_content, special_tokens=True) for chunk in chunks]
+    truncated = sum(count > max_tokens for count in tokens)
+    print(f"{name:<28} {len(chunks):>6} chunks   {len(chunks) / elapsed:9.1f} chunks/s   "
+          f"mean {sum(tokens) / len(tokens):6.1f} tokens   max {max(tokens):5d}   "
+          f"truncated {truncated / len(chunks):6.1%}")
+
+def split_parallel(pages, params, workers: int, group: int = 16):
+    groups = [pages[i:i + group] for i in range(0, len(pages), group)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Load the tokenizer in every worker before timing
+        list(executor.map(count_tokens, ["warm up"] * workers * 4))
+        start = time.perf_counter()
+        chunks = [chunk for result in executor.map(split_pages, groups, [params] * len(groups)) for chunk in result]
+        return chunks, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4])
+    parser.add_argument("--max-tokens", type=int, default=512)
+    args = parser.parse_args()
+    
+    pages = sample_pages(args.pages)
+    params = resolve_chunking()
+    get_tokenizer()
+    
+    start = time.perf_counter()
+    chars = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200).split_documents(pages)
+    report("characters 1000/200", chars, time.perf_counter() - start, args.max_tokens)
+    
+    start = time.perf_counter()
+    chunks = split_pages(pages, params)
+    report(f"tokens {params.chunk_size}/{params.chunk_overlap}, thread", chunks, time.perf_counter() - start, args.max_tokens)
+    
+    failed = False
+    for workers in args.workers:
+        parallel, elapsed = split_parallel(pages, params, workers)
+        report(f"tokens, {workers} processes", parallel, elapsed, args.max_tokens)
+        if [chunk.page_content for chunk in parallel] != [chunk.page_content for chunk in chunks]:
+            print("  parallel chunks differ from the thread's")
+            failed = True
+    
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import asyncio
+import os
+import pytest
+
+# Settings requires these; tests that need a database skip without a real one
+os.environ.setdefault("DATABASE_URL", "postgresql://postgres@localhost/rag_test")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+@pytest.fixture
+def run_with_db():
+    """Run `scenario(db)` on a fresh session in its own event loop; skips the
+    test when DATABASE_URL does not point at a reachable Postgres"""
+    from app.database.base import AsyncSessionLocal, engine, init_db, ping_db
+    
+    def run(scenario):
+        async def main():
+            try:
+                if not await ping_db():
+                    return False, None
+                await init_db()
+                async with AsyncSessionLocal() as db:
+                    return True, await scenario(db)
+            finally:
+                # Pooled connections belong to this loop
+                await engine.dispose()
+        
+        available, result = asyncio.run(main())
+        if not available:
+            pytest.skip("no database at DATABASE_URL")
+        return result
+    
+    return run
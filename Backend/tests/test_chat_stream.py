@@ -0,0 +1,113 @@
+import json
+from types import SimpleNamespace
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from app.api import chat
+from app.database.base import get_db
+from app.schemas.auth import Principal
+from app.utils.dependencies import get_current_user, get_chat_model_factory
+
+ANSWER = "The error code is E21 on page three."
+
+class FakeSession:
+    """Stands in for AsyncSession; records commit/close in order"""
+    
+    def __init__(self, calls: list, name: str):
+        self.calls, self.name = calls, name
+    
+    async def commit(self):
+        self.calls.append((self.name, "commit"))
+    
+    async def close(self):
+        self.calls.append((self.name, "close"))
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        await self.close()
+
+def make_client(monkeypatch, chat_history: list):
+    """Client for the chat router with retrieval and persistence replaced; returns (client, calls)"""
+    calls = []
+    chunk = SimpleNamespace(content="Error E21 means the filter is blocked.", metadata={"filename": "manual.pdf", "page": 3})
+    
+    async def retrieve_chunks(db, request, user_id, timings):
+        calls.append(("request", "retrieve"))
+        return [0.1, 0.2], [chunk]
+    
+    async def load_history(db, session):
+        return chat_history
+    
+    async def get_session(db, session_id, user_id):
+        return SimpleNamespace(id=session_id)
+    
+    async def lookup(db, user_id, query_embedding, chunks):
+        return None
+    
+    async def store(db, user_id, question, query_embedding, chunks, answer, generate_ms):
+        calls.append((db.name, f"cache {answer}"))
+    
+    async def save_exchange(db, user_id, session_id, question, answer):
+        calls.append((db.name, f"save {answer}"))
+        return session_id or 7
+    
+    monkeypatch.setattr(chat, "retrieve_chunks", retrieve_chunks)
+    monkeypatch.setattr(chat, "get_session", get_session)
+    monkeypatch.setattr(chat, "save_exchange", save_exchange)
+    monkeypatch.setattr(chat, "AsyncSessionLocal", lambda: FakeSession(calls, "stream"))
+    monkeypatch.setattr(chat.chat_history_service, "load", load_history)
+    monkeypatch.setattr(chat.chat_history_service, "schedule_summary", lambda session_id, llm: calls.append(("summary", session_id)))
+    monkeypatch.setattr(chat.answer_cache, "lookup", lookup)
+    monkeypatch.setattr(chat.answer_cache, "store", store)
+    
+    async def request_db():
+        yield FakeSession(calls, "request")
+    
+    app = FastAPI()
+    app.include_router(chat.router)
+    app.dependency_overrides[get_db] = request_db
+    app.dependency_overrides[get_current_user] = lambda: Principal(id=1, email="a@example.com", username="a", is_active=True)
+    app.dependency_overrides[get_chat_model_factory] = lambda: (
+        lambda api_key=None: GenericFakeChatModel(messages=iter([AIMessage(content=ANSWER)]))
+    )
+    return TestClient(app), calls
+
+def parse_events(body: str) -> list:
+    events = []
+    for block in body.strip().split("\n\n"):
+        event, data = block.split("\n")
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+def test_stream_emits_tokens_and_saves_answer(monkeypatch):
+    client, calls = make_client(monkeypatch, chat_history=[])
+    
+    with client.stream("POST", "/api/chat/query/stream", json={"question": "What is E21?", "groq_api_key": "k"}) as response:
+        assert response.status_code == 200
+        events = parse_events(response.read().decode())
+    
+    names = [name for name, _ in events]
+    assert names[0] == "citations" and names[-1] == "done"
+    assert names.count("token") > 1  # streamed, not sent in one piece
+    assert "".join(data for name, data in events if name == "token") == ANSWER
+    assert events[-1][1]["session_id"] == 7
+    assert ("stream", f"cache {ANSWER}") in calls
+    assert ("stream", f"save {ANSWER}") in calls
+
+def test_stream_with_history_commits_request_session_before_closing(monkeypatch):
+    history = [HumanMessage(content="Hi"), AIMessage(content="Hello")]
+    client, calls = make_client(monkeypatch, chat_history=history)
+    
+    with client.stream("POST", "/api/chat/query/stream", json={"question": "And E21?", "session_id": 3, "groq_api_key": "k"}) as response:
+        events = parse_events(response.read().decode())
+    
+    # Writes made on the request session must not be rolled back
+    request_calls = [call for scope, call in calls if scope == "request"]
+    assert request_calls[:3] == ["retrieve", "commit", "close"]
+    name, done = events[-1]
+    assert name == "done" and done["session_id"] == 3 and not done["cached"]
+    assert ("stream", f"cache {ANSWER}") not in calls
+    assert ("summary", 3) in calls
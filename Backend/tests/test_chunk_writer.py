@@ -0,0 +1,43 @@
+import uuid
+import pytest
+from sqlalchemy import select
+from app.config import settings
+from app.models.chat import ChatSession  # noqa: F401 (User relationship target)
+from app.models.document import Document, DocumentChunk
+from app.models.user import User
+from app.services.chunk_writer import chunk_writer
+
+@pytest.mark.parametrize("method", ["copy", "values"])
+def test_written_chunks_keep_their_metadata(run_with_db, monkeypatch, method):
+    monkeypatch.setattr(settings, "CHUNK_INSERT_METHOD", method)
+    
+    async def scenario(db):
+        user = User(email=f"{uuid.uuid4().hex}@example.com", username=uuid.uuid4().hex[:12], hashed_password="-")
+        db.add(user)
+        await db.flush()
+        document = Document(user_id=user.id, filename="manual.pdf", source_type="pdf")
+        db.add(document)
+        await db.flush()
+        
+        await chunk_writer.write(db, [
+            {
+                "document_id": document.id,
+                "user_id": user.id,
+                "chunk_index": index,
+                "content": f"chunk {index}",
+                "embedding": [0.5] * settings.EMBEDDING_DIMENSION,
+                "metadata": {"page": index, "source": "manual.pdf"}
+            }
+            for index in range(3)
+        ])
+        result = await db.execute(
+            select(DocumentChunk.chunk_index, DocumentChunk.meta_data)
+            .where(DocumentChunk.document_id == document.id)
+            .order_by(DocumentChunk.chunk_index)
+        )
+        rows = result.all()
+        await db.rollback()
+        return rows
+    
+    rows = run_with_db(scenario)
+    assert [metadata for _, metadata in rows] == [{"page": index, "source": "manual.pdf"} for index in range(3)]
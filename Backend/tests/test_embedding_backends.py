@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from app.services.embedding_backends import encode_texts, load_embedding_model
+
+# (mean cosine, worst cosine, mean top-k overlap) each backend must reach against torch
+TOLERANCES = {
+    "onnx": (0.999, 0.995, 0.95),
+    "onnx-int8": (0.98, 0.95, 0.8),
+}
+TOP_K = 5
+
+QUERIES = [
+    "How do I reset my account password?",
+    "What does error code E21 mean?",
+    "Why is the database query slow?",
+    "When is the invoice payment due?",
+    "How are documents split into chunks?",
+]
+
+PASSAGES = [
+    "To reset your password, open account settings and choose 'Forgot password'.",
+    "Passwords must be at least twelve characters long and are hashed with argon2.",
+    "Error code E21 means the water filter is blocked and must be cleaned.",
+    "Error E35 indicates the door is not closed properly.",
+    "Slow queries are usually caused by a missing index on the filtered column.",
+    "Run EXPLAIN ANALYZE to see whether the planner chose a sequential scan.",
+    "Invoices are payable within thirty days of the issue date.",
+    "Late payments incur a two percent monthly fee.",
+    "Uploaded documents are split into overlapping chunks of about 500 tokens.",
+    "Chunk overlap keeps sentences that cross a boundary retrievable.",
+    "The vector index uses HNSW with cosine distance.",
+    "Network latency between the API and the database adds to every request.",
+    "Customers can download previous invoices from the billing page.",
+    "The summary of chapter three covers the installation steps.",
+    "Each page of a PDF becomes one or more chunks with its page number stored.",
+    "Tokens are counted with the embedding model's own tokenizer.",
+]
+
+def load_or_skip(backend: str):
+    pytest.importorskip("sentence_transformers")
+    if backend.startswith("onnx"):
+        pytest.importorskip("onnxruntime")
+    try:
+        return load_embedding_model(backend)
+    except Exception as e:  # model not cached and no network, missing optimum, ...
+        pytest.skip(f"{backend} model unavailable: {e}")
+
+def embed(model, texts) -> np.ndarray:
+    return np.asarray(encode_texts(model, texts), dtype=np.float32)
+
+def top_k(queries: np.ndarray, passages: np.ndarray) -> np.ndarray:
+    return np.argsort(-(queries @ passages.T), axis=1)[:, :TOP_K]
+
+@pytest.fixture(scope="module")
+def reference():
+    model = load_or_skip("torch")
+    return embed(model, QUERIES), embed(model, PASSAGES)
+
+@pytest.mark.parametrize("backend", sorted(TOLERANCES))
+def test_backend_matches_torch(backend, reference):
+    min_mean, min_worst, min_overlap = TOLERANCES[backend]
+    reference_queries, reference_passages = reference
+    model = load_or_skip(backend)
+    queries, passages = embed(model, QUERIES), embed(model, PASSAGES)
+    
+    # Embeddings are normalized, so the row-wise dot product is the cosine
+    cosines = np.sum(np.vstack([queries, passages]) * np.vstack([reference_queries, reference_passages]), axis=1)
+    assert cosines.mean() >= min_mean, f"mean cosine {cosines.mean():.4f}"
+    assert cosines.min() >= min_worst, f"worst cosine {cosines.min():.4f}"
+    
+    expected, actual = top_k(reference_queries, reference_passages), top_k(queries, passages)
+    overlap = np.mean([len(set(e) & set(a)) / TOP_K for e, a in zip(expected, actual)])
+    assert overlap >= min_overlap, f"top-{TOP_K} overlap {overlap:.2f}"
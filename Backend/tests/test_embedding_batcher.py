@@ -0,0 +1,61 @@
+import asyncio
+import threading
+from app.services.embedding_batcher import EmbeddingBatcher
+
+def blocking_encoder():
+    """Encoder whose first batch waits for release; returns (encode, started, release, batches)"""
+    started, release = threading.Event(), threading.Event()
+    batches = []
+    
+    def encode(texts):
+        started.set()
+        release.wait(timeout=5)
+        batches.append(list(texts))
+        return [[float(len(text))] for text in texts]
+    
+    return encode, started, release, batches
+
+def test_cancelled_queued_request_is_skipped():
+    encode, started, release, batches = blocking_encoder()
+    batcher = EmbeddingBatcher(encode)
+    
+    async def scenario():
+        first = asyncio.ensure_future(batcher.aencode(["a"]))
+        await asyncio.to_thread(started.wait, 5)
+        # Both queue behind the running batch; the first caller goes away
+        cancelled = asyncio.ensure_future(batcher.aencode(["bb"]))
+        kept = asyncio.ensure_future(batcher.aencode(["ccc"]))
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        release.set()
+        return await asyncio.wait_for(first, 5), await asyncio.wait_for(kept, 5), cancelled
+    
+    try:
+        first, kept, cancelled = asyncio.run(scenario())
+        assert first == [[1.0]]
+        assert kept == [[3.0]]
+        assert cancelled.cancelled()
+        assert ["bb"] not in batches
+        assert batcher._thread.is_alive()
+    finally:
+        release.set()
+        batcher.stop()
+
+def test_cancel_during_encoding_keeps_batcher_alive():
+    encode, started, release, _ = blocking_encoder()
+    batcher = EmbeddingBatcher(encode)
+    
+    async def scenario():
+        running = asyncio.ensure_future(batcher.aencode(["a"]))
+        await asyncio.to_thread(started.wait, 5)
+        running.cancel()
+        release.set()
+        # The batch finishes without error and the thread serves the next call
+        return await asyncio.wait_for(batcher.aencode(["dddd"]), 5)
+    
+    try:
+        assert asyncio.run(scenario()) == [[4.0]]
+        assert batcher._thread.is_alive()
+    finally:
+        release.set()
+        batcher.stop()
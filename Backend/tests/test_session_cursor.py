@@ -0,0 +1,16 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from app.api.chat import decode_session_cursor, encode_session_cursor
+
+def test_cursor_round_trips_to_the_microsecond():
+    created_at = datetime(2026, 3, 14, 15, 9, 26, 535897, tzinfo=timezone.utc)
+    cursor = encode_session_cursor(SimpleNamespace(created_at=created_at, id=42))
+    assert decode_session_cursor(cursor) == (created_at, 42)
+
+@pytest.mark.parametrize("cursor", ["", "42", "abc_1", "1_2_3", "9" * 30 + "_1"])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_session_cursor(cursor)
+    assert error.value.status_code == 400
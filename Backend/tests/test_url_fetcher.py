@@ -0,0 +1,96 @@
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from app.config import settings
+from app.services.url_fetcher import URLFetcher
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """/slow/<n> answers after a delay and tracks concurrency; /missing is a 404; /big is oversized"""
+    
+    def do_GET(self):
+        server = self.server
+        if self.path == "/missing":
+            self.send_error(404)
+            return
+        if self.path == "/big":
+            body = b"x" * 4096
+        else:
+            with server.lock:
+                server.active += 1
+                server.peak = max(server.peak, server.active)
+            time.sleep(server.delay)
+            with server.lock:
+                server.active -= 1
+            body = f"<html><body>page {self.path}</body></html>".encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, *args):
+        pass
+
+@contextmanager
+def stand_in_server(delay: float = 0.1):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.lock, server.active, server.peak, server.delay = threading.Lock(), 0, 0, delay
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server, server.server_address[1]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+@pytest.fixture
+def fetcher(monkeypatch):
+    monkeypatch.setattr(settings, "URL_FETCH_CONCURRENCY", 4)
+    monkeypatch.setattr(settings, "URL_FETCH_PER_HOST_LIMIT", 2)
+    fetcher = URLFetcher()
+    yield fetcher
+    fetcher.get_executor().shutdown(wait=True)
+
+def test_fetches_at_most_the_per_host_limit_at_once(fetcher):
+    with stand_in_server() as (server, port):
+        urls = [f"http://127.0.0.1:{port}/slow/{index}" for index in range(8)]
+        results = list(fetcher.fetch_many(urls))
+    
+    assert sorted(result.url for result in results) == sorted(urls)
+    assert all(result.error is None and "page /slow/" in result.html for result in results)
+    assert server.peak == 2
+    assert fetcher._hosts == {}  # idle hosts are not kept around
+
+def test_busy_host_does_not_starve_other_hosts(fetcher):
+    # "localhost" and "127.0.0.1" are different hosts to the fetcher
+    with stand_in_server(delay=0.3) as (server, port):
+        busy = [fetcher.submit(f"http://127.0.0.1:{port}/slow/{index}") for index in range(12)]
+        started = time.perf_counter()
+        other = fetcher.submit(f"http://localhost:{port}/slow/other").result(timeout=5)
+        waited = time.perf_counter() - started
+        for future in busy:
+            future.result(timeout=10)
+    
+    assert "page /slow/other" in other
+    # Only the busy host's first two fetches ran ahead of it, not its whole queue
+    assert waited < 1.0
+
+def test_errors_are_reported_per_url(fetcher, monkeypatch):
+    monkeypatch.setattr(settings, "URL_FETCH_MAX_BYTES", 1024)
+    with stand_in_server() as (server, port):
+        closed_port = port + 1 if port < 65535 else port - 1
+        urls = {
+            "ok": f"http://127.0.0.1:{port}/slow/ok",
+            "missing": f"http://127.0.0.1:{port}/missing",
+            "big": f"http://127.0.0.1:{port}/big",
+            "refused": f"http://127.0.0.1:{closed_port}/",
+        }
+        results = {result.url: result for result in fetcher.fetch_many(urls.values())}
+    
+    assert results[urls["ok"]].error is None
+    assert "404" in results[urls["missing"]].error
+    assert "exceeds 1024 bytes" in results[urls["big"]].error
+    assert results[urls["refused"]].html is None and results[urls["refused"]].error
+    assert fetcher._hosts == {}
@@ -1,6 +1,6 @@
-// Configuration file - Change your backend URL here
-const CONFIG = {
-    API_BASE_URL: 'http://127.0.0.1:8000',
-    // For production, change to:
-    // API_BASE_URL: 'https://your-backend.onrender.com'
+// Configuration file - Change your backend URL here
+const CONFIG = {
+    API_BASE_URL: 'http://127.0.0.1:8000',
+    // For production, change to:
+    // API_BASE_URL: 'https://your-backend.onrender.com'
 };
\ No newline at end of file